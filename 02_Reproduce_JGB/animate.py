@@ -10,7 +10,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 from utils.plot import create_animation
 from utils.snap import get_timestamps
-from utils.snap import parse_nemo
+from utils.snap import iter_frames
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -85,11 +85,12 @@ if __name__ == "__main__":
     center_x = np.array([], dtype=np.float32)
     center_y = np.array([], dtype=np.float32)
 
-    for t in times:
-        snap = parse_nemo(
-            filename=args.nemo_file, t=t, remove_artifacts=not args.store_artifacts
-        )  # mass, pos, vel
-
+    frames = iter_frames(
+        filename=args.nemo_file,
+        times=times,
+        remove_artifacts=not args.store_artifacts,
+    )
+    for t, snap in frames:  # mass, pos, vel
         x = snap[1]
         y = snap[2]
         label = f"Time={t:.2f} Myr"
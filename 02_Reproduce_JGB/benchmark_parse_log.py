@@ -0,0 +1,440 @@
+"""Benchmark parsing of Nbody6++GPU log files on a synthetic log."""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+import warnings
+from functools import partial
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from utils.nbody6_log import _FULL_COLS
+from utils.nbody6_log import _KEYVAL_RE
+from utils.nbody6_log import _OUTPUT_DATA
+from utils.nbody6_log import _safe_float
+from utils.nbody6_log import load_scaling
+from utils.nbody6_log import parse_log
+
+_HEADER = """ Nbody6++GPU synthetic log
+
+   ETAI      ETAR      RS0   DTADJ   DELTAT   TCRITP    TCRIT    QE
+
+   0.020     0.030     0.30  1.0     1.0      1.0E+05   100.0    2.0E-05
+  DTMIN     RMIN     ETAU    ECLOSE   GMIN     GMAX
+
+  1.0E-04  1.0E-03  0.200   1.0      1.0E-06  1.0E-03
+ PHYSICAL SCALING:    R* = 2.5E+00  M* = 1.2E+03  V* = 1.4E+00  T* = 1.7E+00
+"""
+
+_ADJUST_NAMES = [
+    "T[Myr]",
+    "Q",
+    "DE",
+    "DELTA",
+    "DETOT",
+    "E",
+    "EKIN",
+    "POT",
+    "ETIDE",
+    "ETOT",
+    "EBIN",
+    "EMERGE",
+    "ESUB",
+    "ECOLL",
+    "EMDOT",
+    "ECDOT",
+]
+
+# typical event lines between outputs which are not parsed
+_EVENT_LINES = [
+    " NEW KS   TIME={t:.6E}  NM =  1234  5678  ECC = 0.512  R = 1.2E-04  H = -3.5E+01",
+    " END KS   TIME={t:.6E}  NAME =  1234  5678  KSTAR   1   1  PERT = 1.0E-05",
+    " NEW HIARCH  TIME={t:.6E}  NAME =  4321  8765  ECC = 0.3  PMIN = 2.1E-05",
+    " COAL   TIME={t:.6E}  NAME =   42   43  K* =  1  1  M = 1.0E-04 1.1E-04",
+    " NBODY6++ step statistics  TIME={t:.6E}  NNPRED =    1024  NBFULL =      12",
+]
+
+
+def _output_step(t: float, rng: np.random.Generator, n_events: int) -> str:
+    """Log lines written at one output time: events, ADJUST block, output
+    tables, HDF5 summary and STEP histograms."""
+    lines = [rng.choice(_EVENT_LINES).format(t=t) for _ in range(n_events)]
+
+    values = rng.normal(size=len(_ADJUST_NAMES))
+    lines += [
+        " ADJUST:  TIME {:.2f}  ".format(t)
+        + "  ".join(
+            f"{name} {value:.6E}" for name, value in zip(_ADJUST_NAMES, values)
+        ),
+        "",
+        f"  DTMIN = {abs(values[0]):.3E}  RMIN = {abs(values[1]):.3E}  NNB = 12",
+        "   rank     N    Reg.   Irr.    KS   NPAIRS",
+        f"   0  {100000 - int(t)}  {2000 + int(t)}  {4000 + int(t)}  3  7",
+        f"  ETAI = {0.02:.4E}  ETAR = {0.03:.4E}  ETAU = {0.2:.4E}",
+    ]
+
+    for name in sorted(_OUTPUT_DATA):
+        values = np.abs(rng.normal(size=len(_FULL_COLS)))
+        lines.append(
+            f"  {t:.4E}".replace("E", "D")
+            + f" {name}  "
+            + " ".join(f"{value:.4E}" for value in values)
+        )
+
+    lines.append(
+        f" TTOT   {t:.5f}   N_STAR  100000   N_BINARY  {int(t) % 50}   N_MERGER  {int(t) % 7}   Output reduced 0/1=   0"
+    )
+    lines.append(" STEP I " + " ".join(map(str, rng.integers(0, 5000, 16))))
+    lines.append(" STEP R " + " ".join(map(str, rng.integers(0, 5000, 16))))
+    return "\n".join(lines) + "\n"
+
+
+def generate_log(filename: Path, size: int, n_events: int = 30, seed: int = 0):
+    """Write a synthetic log of about `size` bytes.
+
+    Parameters
+    ----------
+    filename : Path
+        Output file.
+    size : int
+        Size of the log in bytes.
+    n_events : int
+        The number of unparsed event lines between outputs. Default: 30.
+    seed : int
+        Random seed. Default: 0.
+    """
+    rng = np.random.default_rng(seed)
+    # a few distinct steps are repeated with new times to keep generation fast
+    templates = [_output_step(0.0, rng, n_events) for _ in range(16)]
+    with open(filename, "w") as fh:
+        fh.write(_HEADER)
+        written, t = len(_HEADER), 0.0
+        while written < size:
+            step = templates[int(t) % len(templates)].replace(
+                "TIME 0.00", f"TIME {t:.2f}"
+            )
+            step = step.replace("  0.0000D+00 ", f"  {t:.4E} ".replace("E", "D"))
+            step = step.replace("TTOT   0.00000", f"TTOT   {t:.5f}")
+            fh.write(step)
+            written += len(step)
+            t += 1.0
+
+
+def baseline_parse_log(logfile: Path) -> dict:
+    """The parser `parse_log` replaced: all lines are read at once and
+    every line is matched against all record types with regexes.
+
+    Kept as the reference for timings and results, see `parse_log` for
+    the returned dict.
+    """
+    with logfile.open("r") as fh:
+        lines = fh.readlines()
+
+    scaling = load_scaling(logfile)
+
+    pre_etai: Optional[float] = None
+    pre_etar: Optional[float] = None
+    pre_etau: Optional[float] = None
+
+    for i, raw in enumerate(lines[:50]):
+        s = raw.strip()
+        if s.startswith("ETAI") and "ETAR" in s:
+            parts = lines[i + 2].split()
+            pre_etai = _safe_float(parts[0])
+            pre_etar = _safe_float(parts[1])
+        elif s.startswith("DTMIN") and "RMIN" in s and "ETAU" in s:
+            parts = lines[i + 2].split()
+            pre_etau = _safe_float(parts[2])
+
+    adjust_rows: List[Dict] = []
+    output_rows: Dict[str, List[Tuple[float, List[float]]]] = {
+        name: [] for name in _OUTPUT_DATA
+    }
+    step_lists: Dict[str, List[List[int]]] = {"I": [], "R": []}
+    ks_params: Dict[float, Dict[str, float]] = {}
+    profile_params: Dict[float, Dict[str, float]] = {}
+    eta_params: Dict[float, Dict[str, float]] = {}
+    hdf5_params: Dict[float, Dict[str, float]] = {}
+
+    current_time_idx: Optional[float] = None
+
+    for i, raw in enumerate(lines):
+        if not raw.strip():
+            continue
+
+        line = raw.replace("*****", " nan")
+        stripped = line.strip()
+
+        # STEP lines
+        if stripped.startswith("STEP I") or stripped.startswith("STEP R"):
+            parts = stripped.split()
+            step_type = parts[1]
+            try:
+                values = [int(x) for x in parts[2:]]
+            except ValueError:
+                continue
+            if step_type in step_lists:
+                step_lists[step_type].append(values)
+            continue
+
+        # ADJUST lines
+        if "ADJUST:" in line:
+            toks = re.sub(r"\s+", " ", line).strip().split(" ")
+            if len(toks) >= 3:
+                try:
+                    time_val = float(toks[2])
+                except ValueError:
+                    try:
+                        time_val = float(toks[2].replace("D", "E"))
+                    except Exception:
+                        continue
+                current_time_idx = time_val
+                row: Dict = {"time": time_val}
+                for c, v in zip(toks[3::2], toks[4::2]):
+                    row[c] = _safe_float(v)
+                adjust_rows.append(row)
+
+            try:
+                matches = _KEYVAL_RE.findall(lines[i + 2])
+                if matches:
+                    params = {k: float(v) for k, v in matches if k in ("DTMIN", "RMIN")}
+                    if params:
+                        ks_params[current_time_idx] = params
+
+                profile_header = lines[i + 3].strip().split()
+                profile_vals = lines[i + 4].strip().split()
+                if "rank" in profile_header:
+                    profile_params[current_time_idx] = {
+                        k: _safe_float(v)
+                        for k, v in zip(profile_header, profile_vals)
+                        if k in ("N", "Reg.", "Irr.", "KS")
+                    }
+            except:
+                warnings.warn("Log incomplete! Seems like simulation stopped abruptly")
+                break
+
+            try:
+                eta_line = lines[i + 5]
+                if "ETAI" in eta_line and "=" in eta_line:
+                    matches = _KEYVAL_RE.findall(eta_line)
+                    params = {
+                        k: float(v) for k, v in matches if k in ("ETAI", "ETAU", "ETAR")
+                    }
+                    pre_etai = params["ETAI"]
+                    pre_etar = params["ETAR"]
+                    pre_etau = params["ETAU"]
+                else:
+                    params = {"ETAI": pre_etai, "ETAR": pre_etar, "ETAU": pre_etau}
+                eta_params[current_time_idx] = params
+            except:
+                warnings.warn("Log incomplete! Seems like simulation stopped abruptly")
+                break
+            continue
+
+        # Output-type lines (RLAGR, AVMASS, ...)
+        for data_type in _OUTPUT_DATA:
+            if data_type in line:
+                toks = re.sub(r"\s+", " ", raw).strip().split(" ")
+                if len(toks) < 3:
+                    break
+                try:
+                    time_val = float(toks[0].replace("D", "E"))
+                except ValueError:
+                    break
+                values = [_safe_float(vt) for vt in toks[2:]]
+                output_rows[data_type].append((time_val, values))
+                break
+
+        match = re.search(
+            r"TTOT\s+([0-9.eE+-]+)\s+"
+            r"N_STAR\s+(\d+)\s+"
+            r"N_BINARY\s+(\d+)\s+"
+            r"N_MERGER\s+(\d+)\s+"
+            r"Output reduced 0/1=\s+(\d+)",
+            raw,
+        )
+        if match:
+            try:
+                ttot = float(match.group(1))
+            except ValueError:
+                continue
+            hdf5_params[ttot] = {
+                "N_STAR": int(match.group(2)),
+                "N_BINARY": int(match.group(3)),
+                "N_MERGER": int(match.group(4)),
+            }
+
+    if adjust_rows:
+        df_adjust = pd.DataFrame(adjust_rows).set_index("time").sort_index()
+    else:
+        df_adjust = pd.DataFrame()
+    df_ks = pd.DataFrame.from_dict(ks_params, orient="index")
+    df_profile = pd.DataFrame.from_dict(profile_params, orient="index")
+    df_eta = pd.DataFrame.from_dict(eta_params, orient="index")
+    df_hdf5 = pd.DataFrame.from_dict(hdf5_params, orient="index")
+
+    def deduplicate(df):
+        if not df.empty and not df.index.is_unique:
+            df = df.groupby(level=0).last()
+        return df
+
+    df_adjust = deduplicate(df_adjust)
+    df_hdf5 = deduplicate(df_hdf5)
+    df_adjust = pd.concat(
+        [df_adjust, deduplicate(df_profile), deduplicate(df_ks), deduplicate(df_eta)],
+        axis=1,
+    )
+
+    output_result: Dict[str, pd.DataFrame] = {}
+    for data_type, rows in output_rows.items():
+        if not rows:
+            output_result[data_type] = pd.DataFrame(columns=_FULL_COLS)
+            continue
+        times, vals_list = zip(*rows)
+        df = pd.DataFrame(vals_list, index=pd.Index(times, name="time"))
+        for i in range(df.shape[1], len(_FULL_COLS)):
+            df[i] = np.nan
+        df = df.iloc[:, : len(_FULL_COLS)]
+        df.columns = _FULL_COLS
+        df.sort_index(inplace=True)
+        output_result[data_type] = df
+
+    step_dfs: Optional[Dict[str, pd.DataFrame]] = None
+    if any(step_lists.values()):
+        step_dfs = {}
+        for key, rows in step_lists.items():
+            if not rows:
+                continue
+            maxlen = max(len(r) for r in rows)
+            normalized = [r + [np.nan] * (maxlen - len(r)) for r in rows]
+            step_dfs[key] = pd.DataFrame(
+                normalized, columns=[f"bin_{i}" for i in range(maxlen)]
+            )
+
+    return {
+        "adjust": df_adjust,
+        "output": output_result,
+        "hdf5_output": df_hdf5,
+        "step": step_dfs,
+        "scaling": scaling,
+    }
+
+
+def assert_same_result(expected: dict, actual: dict):
+    """Check that two results of `parse_log` hold exactly the same data."""
+    pd.testing.assert_frame_equal(
+        expected["adjust"], actual["adjust"], check_exact=True
+    )
+    pd.testing.assert_frame_equal(
+        expected["hdf5_output"], actual["hdf5_output"], check_exact=True
+    )
+    if sorted(expected["output"]) != sorted(actual["output"]):
+        raise RuntimeError("parsers found different output tables")
+    for name, df in expected["output"].items():
+        pd.testing.assert_frame_equal(df, actual["output"][name], check_exact=True)
+    if (expected["step"] is None) != (actual["step"] is None):
+        raise RuntimeError("only one parser found STEP lines")
+    for name, df in (expected["step"] or {}).items():
+        pd.testing.assert_frame_equal(df, actual["step"][name], check_exact=True)
+    if expected["scaling"] != actual["scaling"]:
+        raise RuntimeError(
+            f"scaling differs: {expected['scaling']} != {actual['scaling']}"
+        )
+
+
+def best_time(func: Callable[[], dict], repeat: int) -> Tuple[float, dict]:
+    """The best time of `repeat` calls and the result of the last call."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="This program writes a synthetic Nbody6++GPU log and measures how fast `parse_log` reads it "
+        "compared to the line-by-line regex parser it replaced (the results are checked to be equal)"
+    )
+    parser.add_argument(
+        "--size",
+        type=float,
+        default=1024,
+        help="Size of the synthetic log in MB. Default: 1024",
+    )
+    parser.add_argument(
+        "--log-file",
+        type=str,
+        default=None,
+        help="Log to parse. It is generated if it does not exist. Default: a temporary file which is removed afterwards",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="The number of timed runs, the best one is reported. Default: 1",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of worker processes parsing chunks of the log, 0 uses all cores. Default: 1",
+    )
+    parser.add_argument(
+        "--no-baseline",
+        action="store_true",
+        help="Whether to skip the baseline parser, it keeps all lines of the log in memory",
+    )
+    args = parser.parse_args()
+
+    if args.log_file is None:
+        fd, log_file = tempfile.mkstemp(suffix=".out")
+        os.close(fd)
+        log_file, remove = Path(log_file), True
+        generate_log(log_file, int(args.size * 1024**2))
+    else:
+        log_file, remove = Path(args.log_file), False
+        if not log_file.exists():
+            generate_log(log_file, int(args.size * 1024**2))
+
+    try:
+        size_mb = log_file.stat().st_size / 1024**2
+
+        # reading lines is the lower bound for any line-based parser
+        start = time.perf_counter()
+        with open(log_file) as fh:
+            n_lines = sum(1 for _ in fh)
+        read_time = time.perf_counter() - start
+        print(
+            f"{log_file}: {size_mb:.0f} MB, {n_lines} lines, reading lines takes {read_time:.1f} s"
+        )
+
+        best, data = best_time(
+            partial(parse_log, log_file, jobs=args.jobs), args.repeat
+        )
+        print(
+            f"parse_log (jobs={args.jobs}): {best:.1f} s ({size_mb / best:.0f} MB/s), "
+            f"{len(data['adjust'])} ADJUST rows, {len(data['output']['RLAGR'])} RLAGR rows"
+        )
+
+        if not args.no_baseline:
+            baseline_best, expected = best_time(
+                partial(baseline_parse_log, log_file), args.repeat
+            )
+            assert_same_result(expected, data)
+            print(
+                f"baseline: {baseline_best:.1f} s ({size_mb / baseline_best:.0f} MB/s), "
+                f"parse_log is {baseline_best / best:.1f}x faster, results are equal"
+            )
+    finally:
+        if remove:
+            log_file.unlink()
@@ -12,9 +12,14 @@ if __name__ == "__main__":
         required=True,
         help="Path to directory with experiment",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Whether to parse the whole log instead of using its cache (exp.out.parsed.npz)",
+    )
     args = parser.parse_args()
     exp = Path(args.exp)
-    df_adjust = load_data(exp / "exp.out")["adjust"]
+    df_adjust = load_data(exp / "exp.out", cache=not args.no_cache)["adjust"]
 
     print(f"max(DE) = {np.max(np.abs(df_adjust['DE']))}")
     print(f"max(DETOT) = {np.max(np.abs(df_adjust['DETOT']))}")
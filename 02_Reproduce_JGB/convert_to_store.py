@@ -0,0 +1,43 @@
+"""Convert a NEMO snapshot into a columnar memory-mapped store."""
+
+import argparse
+from pathlib import Path
+
+from utils.nemofile import SnapStore
+from utils.nemofile import convert_to_store
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="This program converts a NEMO snapshot into a directory of memory-mapped arrays "
+        "which can be used instead of the snapshot by analysis scripts"
+    )
+    parser.add_argument(
+        "--nemo-file",
+        type=str,
+        required=True,
+        help="Nemo file",
+    )
+    parser.add_argument(
+        "--store-dir",
+        type=str,
+        default=None,
+        help="Output directory. Default: <filename>.store next to the snapshot",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Whether to replace an existing store",
+    )
+    args = parser.parse_args()
+
+    if not Path(args.nemo_file).exists():
+        raise RuntimeError(f"filename {args.nemo_file} does not exist")
+
+    store_dir = convert_to_store(
+        args.nemo_file, store_dir=args.store_dir, overwrite=args.overwrite
+    )
+    store = SnapStore(store_dir)
+    print(
+        f"Stored {len(store)} frames ({store.bounds[-1]} particles in total, "
+        f"fields: {', '.join(store.fields)}) into {store_dir}"
+    )
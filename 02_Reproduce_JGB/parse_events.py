@@ -41,6 +41,11 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether to plot DE, DETOT and events-connected images.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Whether to parse the whole log instead of using its cache (exp.out.parsed.npz)",
+    )
     args = parser.parse_args()
     exp = Path(args.exp)
 
@@ -64,7 +69,7 @@ if __name__ == "__main__":
     event_times = []
     events = {}
 
-    log_data = load_data(exp / "exp.out")
+    log_data = load_data(exp / "exp.out", cache=not args.no_cache)
 
     try:
         scalings = log_data["scaling"]
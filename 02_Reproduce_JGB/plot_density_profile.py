@@ -1,17 +1,52 @@
 """Plot density for a given NEMO snapshot."""
 
+from functools import partial
 from pathlib import Path
 
 import agama
 import matplotlib.pyplot as plt
 import numpy as np
+from utils.cache import ResultCache
 from utils.general import check_parameters
 from utils.general import compute_mean_mass
 from utils.general import create_argparse
 from utils.general import set_units
 from utils.plot import prepare_env_plots
+from utils.snap import SnapFrame
+from utils.snap import cached_frame_results
+from utils.snap import find_density_center
 from utils.snap import get_timestamps
-from utils.snap import profile_by_snap
+
+
+def compute_profiles(
+    t: float,
+    frame: SnapFrame,
+    dens_par: int,
+    proj_vector: list = None,
+    remove_outliers: bool = False,
+) -> dict:
+    """Spherical profile or projected profiles (one per vector in
+    `proj_vector`) around the density center.
+
+    Returns an empty dict if the density center is not found and
+    `remove_outliers` is set.
+    """
+    if dens_par:
+        try:
+            frame.center = find_density_center(
+                frame.positions, frame.masses, k=dens_par
+            )
+        except RuntimeError:  # failed to find a density center
+            if remove_outliers:
+                return {}
+            raise
+
+    if proj_vector is not None:
+        profiles = frame.projected_profiles(proj_vector)
+    else:
+        profiles = [frame.spherical_profile()]
+    return {f"profile_{i}": prof for i, prof in enumerate(profiles)}
+
 
 if __name__ == "__main__":
     parser = create_argparse(
@@ -33,7 +68,9 @@ if __name__ == "__main__":
         "--proj-vector",
         type=float,
         nargs=3,
-        help="Vector for density profile calculations when using '--projprof'.",
+        action="append",
+        help="Vector for density profile calculations when using '--projprof'. "
+        "Repeat to plot several lines of sight.",
     )
     parser.add_argument(
         "--n-timestamps",
@@ -51,6 +88,17 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether to remove outliers from non-converged dense_cluster",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Whether to recompute per-frame results instead of using the on-disk cache",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of worker processes for per-timestamp computations (0 means all cores). Default: 1",
+    )
     parser.add_argument(
         "--dens-parameter",
         type=int,
@@ -68,7 +116,7 @@ if __name__ == "__main__":
         raise RuntimeError(f"filename {filename} does not exist")
     save_dir = filename.absolute().parent
 
-    env = prepare_env_plots(args.texsystem)
+    ext = prepare_env_plots(args.texsystem)
 
     # Compute total mass for the distribution by multiplying the number of samples by E[x] of distribution
     mass_math_expectation = compute_mean_mass(
@@ -112,22 +160,35 @@ if __name__ == "__main__":
         n_timestamps=args.n_timestamps,
     )
 
-    for t in times_list:
-        prof = profile_by_snap(
-            filename=filename,
-            t=t,
-            projvector=proj_vector,
-            remove_artifacts=not args.store_artifacts,
+    results = cached_frame_results(
+        ResultCache(enabled=not args.no_cache),
+        filename=filename,
+        times=times_list,
+        compute=partial(
+            compute_profiles,
             dens_par=args.dens_parameter,
-        )
-        try:
-            r_prof, rho_prof = prof[0], prof[1]
-        except IndexError:  # dens_centre failed to find a center
-            if args.remove_outliers:
-                continue
-            raise
+            proj_vector=proj_vector,
+            remove_outliers=args.remove_outliers,
+        ),
+        jobs=args.jobs,
+        remove_artifacts=not args.store_artifacts,
+        dens_par=args.dens_parameter,
+        proj_vector=proj_vector,
+        remove_outliers=args.remove_outliers,
+    )
 
-        plt.plot(r_prof, rho_prof, label=f"$t$={t * 1e-3:.2f} Gyr")
+    for t, result in zip(times_list, results):
+        if not result:  # skipped outlier
+            continue
+
+        if args.projprof:
+            for i, vec in enumerate(proj_vector):
+                r_prof, rho_prof = result[f"profile_{i}"]
+                los = f", los={tuple(vec)}" if len(proj_vector) > 1 else ""
+                plt.plot(r_prof, rho_prof, label=f"$t$={t * 1e-3:.2f} Gyr{los}")
+        else:
+            r_prof, rho_prof = result["profile_0"]
+            plt.plot(r_prof, rho_prof, label=f"$t$={t * 1e-3:.2f} Gyr")
 
     plt.legend(title=label)
     if args.projprof:
@@ -1,16 +1,59 @@
 """This program plots lagrange radius and other related stats for given
 snapshots."""
 
+from functools import partial
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
+from utils.cache import ResultCache
 from utils.general import check_parameters
 from utils.general import create_argparse
+from utils.parallel import parallel_map
 from utils.plot import prepare_env_plots
+from utils.snap import build_index
 from utils.snap import get_timestamps
 from utils.snap import masses_in_lagrange_radius
 
+
+def lagrange_stats(
+    cache: ResultCache,
+    filename: str,
+    t: float,
+    remove_artifacts: bool,
+    dens_par: int,
+    fraction: float,
+    center_backend: str,
+) -> dict:
+    """Lagrange radius, the number of particles and their mean mass inside
+    it (cached on disk)."""
+
+    def compute():
+        masses, lagrange_r, mask = masses_in_lagrange_radius(
+            filename=filename,
+            t=t,
+            remove_artifacts=remove_artifacts,
+            dens_par=dens_par,
+            fraction=fraction,
+            center_backend=center_backend,
+        )
+        m_filtered = masses[mask]
+        return {
+            "lagrange_r": lagrange_r,
+            "N": m_filtered.size,
+            "mean_mass": np.mean(m_filtered),
+        }
+
+    key = cache.key(
+        filename,
+        t,
+        dens_par=dens_par,
+        fraction=fraction,
+        center_backend=center_backend,
+    )
+    return cache.get_or_compute(key, compute)
+
+
 if __name__ == "__main__":
     parser = create_argparse(
         description="This program plots lagrange radius and other related stats for given snapshots"
@@ -53,11 +96,29 @@ if __name__ == "__main__":
         default=500,
         help="The number of neighbours in SPH-like estimation for 'dens_centre' manipulator. If 0, density center is not computed. Default: 500",
     )
+    parser.add_argument(
+        "--center-backend",
+        type=str,
+        choices=["numpy", "nemo"],
+        default="numpy",
+        help="How to compute density center: in-process Casertano-Hut estimate ('numpy') or NEMO's 'dens_centre' ('nemo'). Default: numpy",
+    )
     parser.add_argument(
         "--store-artifacts",
         action="store_true",
         help="Whether to store NEMO artifacts for debug",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Whether to recompute per-frame results instead of using the on-disk cache",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of worker processes for per-timestamp computations (0 means all cores). Default: 1",
+    )
     parser.add_argument(
         "--remove-outliers",
         action="store_true",
@@ -103,6 +164,8 @@ if __name__ == "__main__":
     ax_mrt.grid()
     # ax_mrt.set_title(f"Mean mass of particles in Lagrange radius ({mass_percent}%)")
 
+    cache = ResultCache(enabled=not args.no_cache)
+
     for i, filename in enumerate(args.nemo_files):
         if not Path(filename).exists():
             raise RuntimeError(f"filename {filename} does not exist")
@@ -118,37 +181,35 @@ if __name__ == "__main__":
             default=args.default_timestamps,
         )
         print("times list", times_list)
+        build_index(filename)  # once, before workers read frames
+
+        # Lagrange radius and related stats, retried without density center
+        # if it is not found
+        tasks = parallel_map(
+            partial(
+                lagrange_stats,
+                cache,
+                filename,
+                remove_artifacts=not args.store_artifacts,
+                dens_par=args.dens_parameter,
+                fraction=args.fraction,
+                center_backend=args.center_backend,
+            ),
+            times_list,
+            jobs=args.jobs,
+            retry_kwargs={"dens_par": 0},
+        )
 
-        for t in times_list:
-            # Lagrange radius and related stats
-            try:
-                masses, lagrange_r, mask = masses_in_lagrange_radius(
-                    filename=filename,
-                    t=t,
-                    remove_artifacts=not args.store_artifacts,
-                    dens_par=args.dens_parameter,
-                    fraction=args.fraction,
-                )
-            except RuntimeError:
-                try:
-                    masses, lagrange_r, mask = masses_in_lagrange_radius(
-                        filename=filename,
-                        t=t,
-                        remove_artifacts=not args.store_artifacts,
-                        dens_par=0,
-                        fraction=args.fraction,
-                    )
-                except:
-                    if args.remove_outliers:
-                        continue
-                    raise
-
-            m_filtered = masses[mask]
+        for t, stats, error in tasks:
+            if error is not None:
+                if isinstance(error, RuntimeError) and args.remove_outliers:
+                    continue
+                raise error
 
             times = np.append(times, t * 1e-3)
-            lagrange_radii = np.append(lagrange_radii, lagrange_r)
-            n_particles_lagrange = np.append(n_particles_lagrange, m_filtered.size)
-            mean_mass_lagrange = np.append(mean_mass_lagrange, np.mean(m_filtered))
+            lagrange_radii = np.append(lagrange_radii, stats["lagrange_r"])
+            n_particles_lagrange = np.append(n_particles_lagrange, stats["N"])
+            mean_mass_lagrange = np.append(mean_mass_lagrange, stats["mean_mass"])
 
         fmt = "."
         ax_rt.plot(times, lagrange_radii, fmt, label=rf"${plot_label[i]}$")
@@ -29,6 +29,13 @@ if __name__ == "__main__":
         required=True,
         help="Which times to use. Example: '--times 0.0 0.5 1.0'",
     )
+    parser.add_argument(
+        "--center-backend",
+        type=str,
+        choices=["numpy", "nemo"],
+        default="numpy",
+        help="How to compute density center: in-process Casertano-Hut estimate ('numpy') or NEMO's 'dens_centre' ('nemo'). Default: numpy",
+    )
     parser.add_argument(
         "--store-artifacts",
         action="store_true",
@@ -84,6 +91,7 @@ if __name__ == "__main__":
                     t=t,
                     remove_artifacts=not args.store_artifacts,
                     dens_par=args.dens_parameter,
+                    center_backend=args.center_backend,
                 )
                 masses = masses[mask]
             except RuntimeError:
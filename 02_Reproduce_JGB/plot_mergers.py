@@ -5,10 +5,29 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import yaml
-from utils.hdf5file import NBodySnapshot
+from utils.hdf5file import NBodyRun
 
 _EVENT_TYPE = yaml.safe_load(open("utils/nbody6_events.yaml"))
 
+# particle table (see NBodySnapshot.find_names) -> spin and mass columns
+_SPIN_COLUMNS = {
+    "single": ("ASPN", "M"),
+    "binary1": ("ASPN1", "Bin M1*"),
+    "binary2": ("ASPN2", "Bin M2*"),
+}
+
+
+def get_spin(snap, idx):
+    found = snap.find_name(idx)
+    if found is None or found[0] not in _SPIN_COLUMNS:
+        raise NotImplementedError(f"Merger case not implemented!")
+
+    table, row = found
+    spin_column, mass_column = _SPIN_COLUMNS[table]
+    print(f"Found particle {idx} in {table}. M={getattr(snap, mass_column)[row]}")
+    return getattr(snap, spin_column)[row]
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description=f"Plots the number of mergers.")
     parser.add_argument(
@@ -70,46 +89,22 @@ if __name__ == "__main__":
         ax_m.plot([0, 70], [0, 17.5], "--", alpha=0.7, label="q=1/4")
 
         # Plot spin distribution
+        run = NBodyRun(exp)
 
         for i in range(len(df_m)):
             df_m_i = df_m.iloc[i]
 
             t = df_m_i["TIME[NB]"]
-            filename = exp / f"snap.40_{int(t + 0.5) + 1}.h5part"  # the next snapshot
-
-            snap = NBodySnapshot(filename)
-            it = iter(snap)
-            snap = next(it)
+            snap = run.after_time(t)  # the next snapshot
 
             # More massive particle absorbs another during collision
             m1, m2 = df_m_i["M(I1)[M*]"], df_m_i["M(I2)[M*]"]
             ind = df_m_i["NAME(I1)"] if m1 > m2 else df_m_i["NAME(I2)"]
             q = (m2 / m1) if m1 > m2 else (m1 / m2)
 
-            def get_spin(snap, idx):
-                if idx in snap.Name:
-                    print(
-                        f"Found particle {idx} in singles. M={snap.M[snap.Name == idx]}"
-                    )
-                    return snap.ASPN[snap.Name == idx]
-
-                if getattr(snap, "Bin Name1", None) is not None:
-                    name1 = getattr(snap, "Bin Name1")
-                    if idx in name1:
-                        print(
-                            f"Found particle {idx} in binaries. M={getattr(snap, 'Bin M1*')[name1 == idx]}"
-                        )
-                        return snap.ASPN1[name1 == idx]
-
-                    name2 = getattr(snap, "Bin Name2")
-                    if idx in name2:
-                        print(
-                            f"Found particle {idx} in binaries. M={getattr(snap, 'Bin M2*')[name2 == idx]}"
-                        )
-                        return snap.ASPN2[name2 == idx]
-                raise NotImplementedError(f"Merger case not implemented!")
-
             ax_s.scatter(q, get_spin(snap, ind))
 
+        run.close()
+
     ax_m.legend()
     plt.show()
@@ -7,7 +7,9 @@ from utils.nbody6_log import _ADJUST_DATA
 from utils.nbody6_log import _COLS
 from utils.nbody6_log import _HDF5_OUTPUT_DATA
 from utils.nbody6_log import _OUTPUT_DATA
-from utils.nbody6_log import load_data
+from utils.nbody6_log import LogParser
+from utils.nbody6_log import cached_parser
+from utils.nbody6_log import log_cache_path
 from utils.nbody6_log import plot_adjust_data
 from utils.nbody6_log import plot_hdf5_output_data
 from utils.nbody6_log import plot_output_data
@@ -21,6 +23,48 @@ def setup_pandas():
     pd.set_option("display.max_colwidth", None)
 
 
+def watch(
+    parser: LogParser,
+    interval: float,
+    values_adjust: list,
+    values_output: list,
+    values_hdf5_output: list,
+    logscale: bool,
+    astro_units: bool,
+):
+    """Re-read the log every `interval` seconds and redraw plots when new
+    lines appear, until interrupted with Ctrl+C."""
+    plt.ion()
+    print(f"Watching {parser.logfile}, press Ctrl+C to stop")
+    try:
+        while True:
+            if parser.update():
+                data = parser.result()
+                if values_adjust and not data["adjust"].empty:
+                    fig = plt.figure("adjust", figsize=(9, 6))
+                    fig.clf()
+                    plot_adjust_data(
+                        data["adjust"], values_adjust, logscale, ax=fig.gca()
+                    )
+                if values_output and (not astro_units or data["scaling"]):
+                    output_data = data["output"]
+                    if astro_units:
+                        output_data = {**output_data, **data["scaling"]}
+                    fig = plt.figure("output", figsize=(12, 8))
+                    plot_output_data(output_data, values_output, astro_units, fig=fig)
+                if values_hdf5_output and not data["hdf5_output"].empty:
+                    fig = plt.figure("hdf5 output", figsize=(9, 6))
+                    fig.clf()
+                    plot_hdf5_output_data(
+                        data["hdf5_output"], values_hdf5_output, ax=fig.gca()
+                    )
+            plt.pause(interval)
+    except KeyboardInterrupt:
+        pass
+    plt.close("all")
+    plt.ioff()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description=f"Parses log file created by Nbody6++GPU-beijing and plots some stats."
@@ -51,6 +95,17 @@ if __name__ == "__main__":
         action="store_true",
         help=f"Whether to plot values in astrophysical units (only for {_OUTPUT_DATA})",
     )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="Follow a running simulation: parse newly appended lines every SECONDS and refresh plots until Ctrl+C, then save and plot as usual",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Whether to parse the whole log instead of using its cache (exp.out.parsed.npz)",
+    )
     args = parser.parse_args()
     save_dir = Path(args.log_file).parent
 
@@ -66,7 +121,24 @@ if __name__ == "__main__":
     if args.full_output:
         setup_pandas()
 
-    data = load_data(args.log_file)
+    if args.no_cache:
+        log_parser = LogParser(args.log_file)
+    else:
+        log_parser = cached_parser(args.log_file)
+    if args.watch:
+        watch(
+            log_parser,
+            args.watch,
+            values_adjust,
+            values_output,
+            values_hdf5_output,
+            logscale=args.logscale,
+            astro_units=args.astro_units,
+        )
+        if not args.no_cache:
+            log_parser.save(log_cache_path(args.log_file))
+    log_parser.update(final=True)
+    data = log_parser.result()
     adjust_data = data["adjust"]
     output_data = data["output"]
     hdf5_data = data["hdf5_output"]
@@ -4,11 +4,19 @@ from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
+from utils.cache import ResultCache
 from utils.general import check_parameters
 from utils.general import create_argparse
 from utils.plot import prepare_env_plots
+from utils.snap import SnapFrame
+from utils.snap import cached_frame_results
 from utils.snap import get_timestamps
-from utils.snap import parse_nemo
+
+
+def compute_stats(t: float, frame: SnapFrame) -> dict:
+    """The number of particles and their mean mass."""
+    return {"N": frame.N, "mean_mass": np.mean(frame.masses)}
+
 
 if __name__ == "__main__":
     parser = create_argparse(
@@ -38,6 +46,17 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether to use default timestamps to plot, this is the fastest way",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Whether to recompute per-frame results instead of using the on-disk cache",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of worker processes for per-timestamp computations (0 means all cores). Default: 1",
+    )
     args = parser.parse_args()
 
     check_parameters(args)  # sanity checks
@@ -66,6 +85,8 @@ if __name__ == "__main__":
     ax_mt.grid()
     # ax_mt.set_title("Mean mass of particles in cluster")
 
+    cache = ResultCache(enabled=not args.no_cache)
+
     for i, filename in enumerate(args.nemo_files):
         if not Path(filename).exists():
             raise RuntimeError(f"filename {filename} does not exist")
@@ -80,16 +101,18 @@ if __name__ == "__main__":
             default=args.default_timestamps,
         )
 
-        for t in times_list:
-            snap = parse_nemo(
-                filename=filename, t=t
-            )  # m, x, y, z, vx, vy, vzMore actions
-
-            masses = snap[0]
+        results = cached_frame_results(
+            cache,
+            filename=filename,
+            times=times_list,
+            compute=compute_stats,
+            jobs=args.jobs,
+        )
 
+        for t, result in zip(times_list, results):
             times = np.append(times, t * 1e-3)
-            n_particles = np.append(n_particles, masses.size)
-            mean_mass = np.append(mean_mass, np.mean(masses))
+            n_particles = np.append(n_particles, result["N"])
+            mean_mass = np.append(mean_mass, result["mean_mass"])
 
         fmt = "."
         ax_nt.plot(
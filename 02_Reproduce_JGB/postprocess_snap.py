@@ -10,7 +10,10 @@ from typing import Union
 import agama
 import numpy as np
 from tqdm import tqdm
+from utils.hdf5file import h5part_to_nemo
+from utils.hdf5file import h5part_to_store
 from utils.nbody6_log import load_scaling
+from utils.nemofile import convert_to_store
 from utils.snap import parse_nemo
 from utils.snap import remove
 
@@ -81,6 +84,18 @@ if __name__ == "__main__":
         default="nbody6++gpu-beijing",
         help="Specify the version of the software. Default: nbody6++gpu-beijing.",
     )
+    parser.add_argument(
+        "--from-h5part",
+        action="store_true",
+        help="nbody6++gpu-beijing only: convert `snap.40_*.h5part` files from the experiment directory directly, "
+        "`out.nemo` is not needed. Only single particles are converted.",
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="nbody6++gpu-beijing only: write a columnar store `out_scaled.store` "
+        "(with --from-h5part, instead of `out_scaled.nemo`)",
+    )
     args = parser.parse_args()
     exp = Path(args.exp)
 
@@ -90,12 +105,19 @@ if __name__ == "__main__":
             f"Scale coefficients: R*={scalings['R*']}[pc], V*={scalings['V*']}[km/s], T*={scalings['T*']}[Myr], M*={scalings['M*']}[Msun]"
         )
 
-        # Snapscale
-        scale_snapshot(
-            filename=exp / "out.nemo",
-            outfile=exp / "out_scaled.nemo",
-            scalings=scalings,
-        )
+        if args.from_h5part and args.store:
+            h5part_to_store(exp, exp / "out_scaled.store", scalings)
+        elif args.from_h5part:
+            h5part_to_nemo(exp, exp / "out_scaled.nemo", scalings)
+        else:
+            # Snapscale
+            scale_snapshot(
+                filename=exp / "out.nemo",
+                outfile=exp / "out_scaled.nemo",
+                scalings=scalings,
+            )
+            if args.store:
+                convert_to_store(exp / "out_scaled.nemo", overwrite=True)
 
     elif args.version in ["nbody0", "nbody1", "nbody2"]:
         # simulation units are: pc, ~232 Msun, km/s (G=1)
@@ -1,13 +1,35 @@
 """Print statistics for a given NEMO snapshot."""
 
 import argparse
+from functools import partial
 from pathlib import Path
 
 import numpy as np
 from colorama import Fore
 from colorama import Style
-from utils.snap import masses_in_lagrange_radius
-from utils.snap import parse_nemo
+from utils.parallel import parallel_map
+from utils.snap import build_index
+from utils.snap import load_frame
+
+
+def frame_stats(
+    t: float,
+    filename: str,
+    remove_artifacts: bool,
+    dens_par: int,
+    fraction: float,
+    center_backend: str,
+) -> tuple[int, float, float]:
+    """The number of particles, total mass and Lagrange radius."""
+    frame = load_frame(
+        filename=filename,
+        t=t,
+        remove_artifacts=remove_artifacts,
+        dens_par=dens_par,
+        center_backend=center_backend,
+    )
+    return frame.N, np.sum(frame.masses), frame.lagrange_radius(fraction)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -34,6 +56,13 @@ if __name__ == "__main__":
         default=100,
         help="The number of neighbours in SPH-like estimation for 'dens_centre' manipulator. If 0, density center is not computed. Default: 500",
     )
+    parser.add_argument(
+        "--center-backend",
+        type=str,
+        choices=["numpy", "nemo"],
+        default="numpy",
+        help="How to compute density center: in-process Casertano-Hut estimate ('numpy') or NEMO's 'dens_centre' ('nemo'). Default: numpy",
+    )
     parser.add_argument(
         "--store-artifacts",
         action="store_true",
@@ -44,6 +73,12 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether to remove outliers from non-converged dense_cluster",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of worker processes for per-timestamp computations (0 means all cores). Default: 1",
+    )
     args = parser.parse_args()
 
     for i, filename in enumerate(args.nemo_files):
@@ -55,26 +90,27 @@ if __name__ == "__main__":
         timestamps = np.array(
             [0.0, 12.0 * 1e3, 13.0 * 1e3, 14.0 * 1e3], dtype=np.float32
         )
+        build_index(filename)  # once, before workers read frames
 
-        for t in timestamps:
-            snap = parse_nemo(filename=filename, t=t)  # m, x, y, z, vx, vy, vz
-
-            masses = snap[0]
-            N = masses.shape[0]
-            m_tot = np.sum(masses)
+        tasks = parallel_map(
+            partial(
+                frame_stats,
+                filename=filename,
+                remove_artifacts=not args.store_artifacts,
+                dens_par=args.dens_parameter,
+                fraction=args.fraction,
+                center_backend=args.center_backend,
+            ),
+            timestamps,
+            jobs=args.jobs,
+        )
 
-            try:
-                masses, lagrange_r, mask = masses_in_lagrange_radius(
-                    filename=filename,
-                    t=t,
-                    remove_artifacts=not args.store_artifacts,
-                    dens_par=args.dens_parameter,
-                    fraction=args.fraction,
-                )
-            except RuntimeError:
-                if args.remove_outliers:
+        for t, stats, error in tasks:
+            if error is not None:
+                if isinstance(error, RuntimeError) and args.remove_outliers:
                     continue
-                raise
+                raise error
+            N, m_tot, lagrange_r = stats
 
             print(
                 f"{Fore.GREEN}\t t={t} Myr N={N} M={m_tot} R_{args.fraction}={lagrange_r} pc{Style.RESET_ALL}"
@@ -0,0 +1,44 @@
+"""Summarize Nbody6++GPU HDF5 snapshots of a run."""
+
+import argparse
+from pathlib import Path
+
+from utils.cache import ResultCache
+from utils.hdf5file import NBodyRun
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="This program computes per-snapshot statistics (particle numbers, mass, half-mass radius, "
+        "the number of black holes) for all snap.40_*.h5part files of a run and stores them as csv"
+    )
+    parser.add_argument(
+        "--exp",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Path to directory with snap.40_*.h5part files",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of worker processes for per-snapshot computations (0 means all cores). Default: 1",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Whether to recompute per-snapshot results instead of using the on-disk cache",
+    )
+    args = parser.parse_args()
+
+    cache = ResultCache(enabled=not args.no_cache)
+
+    for exp in args.exp:
+        exp = Path(exp)
+
+        run = NBodyRun(exp)
+        df = run.summarize(jobs=args.jobs, cache=cache)
+        run.close()
+
+        df.to_csv(exp / "summary.csv", index=False)
+        print(df.to_string(index=False))
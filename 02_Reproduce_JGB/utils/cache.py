@@ -0,0 +1,132 @@
+"""On-disk cache of per-frame analysis results (see
+`utils.snap.cached_frame_results` for NEMO snapshots)."""
+
+import hashlib
+import json
+import os
+import warnings
+import zipfile
+from pathlib import Path
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+import numpy as np
+
+from .nemofile import is_store
+
+# set NBODY_CACHE_DIR to keep the cache somewhere else (e.g. on a faster disk)
+_CACHE_DIR = Path(
+    os.environ.get("NBODY_CACHE_DIR", Path.home() / ".cache" / "nbody_analysis")
+)
+_CACHE_MAX_BYTES = 2 * 1024**3
+# eviction frees space down to this share of max_bytes, so it runs rarely
+_CACHE_EVICT_TO = 0.9
+
+_RESULT_TYPE = dict[str, Union[float, np.ndarray]]
+
+
+class ResultCache:
+    """Stores per-frame results (centers, Lagrange radii, profiles, etc.) as
+    small npz files.
+
+    Results are keyed by snapshot identity (resolved path, size and
+    mtime), time and analysis parameters, so a changed snapshot or
+    different parameters never hit stale entries. When the cache grows
+    above `max_bytes`, least recently used entries are removed.
+
+    The cache directory is scanned once, then its size is tracked by
+    `put`, so adding an entry does not list the whole directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = _CACHE_DIR,
+        max_bytes: int = _CACHE_MAX_BYTES,
+        enabled: bool = True,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._total_bytes: Optional[int] = None  # unknown until the first scan
+
+    def key(self, filename: Union[str, Path], t: float, **params) -> str:
+        """Build a key for a given snapshot, time and analysis
+        parameters."""
+        # stores are replaced as a whole, so their metadata identifies them
+        stat = os.stat(Path(filename) / "meta.json" if is_store(filename) else filename)
+        identity = [
+            str(Path(filename).resolve()),
+            stat.st_size,
+            stat.st_mtime_ns,
+            repr(float(t)),
+            params,
+        ]
+        return hashlib.sha1(
+            json.dumps(identity, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[_RESULT_TYPE]:
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                result = {
+                    name: arr.item() if arr.ndim == 0 else arr
+                    for name, arr in data.items()
+                }
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+
+        os.utime(path)  # mark as recently used
+        return result
+
+    def put(self, key: str, result: _RESULT_TYPE):
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as fh:
+                np.savez(fh, **result)
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except OSError as e:
+            warnings.warn(f"Could not store cache entry {path}: {e}")
+            return
+
+        # other processes may write too, the exact size is known after a scan
+        if self._total_bytes is not None:
+            self._total_bytes += size
+        if self._total_bytes is None or self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], _RESULT_TYPE]):
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def _evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.npz"):
+            try:
+                entries.append((path.stat(), path))
+            except FileNotFoundError:  # removed by another process
+                pass
+        total = sum(stat.st_size for stat, _ in entries)
+        if total > self.max_bytes:
+            for stat, path in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+                if total <= _CACHE_EVICT_TO * self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+        self._total_bytes = total
@@ -1,3 +1,15 @@
+from .convert import h5part_to_nemo
+from .convert import h5part_to_store
+from .run import NBodyRun
+from .run import ParticleHistory
 from .snapshot import NBodySnapshot
+from .summary import frame_summary
 
-__all__ = ["NBodySnapshot"]
+__all__ = [
+    "NBodyRun",
+    "NBodySnapshot",
+    "ParticleHistory",
+    "frame_summary",
+    "h5part_to_nemo",
+    "h5part_to_store",
+]
@@ -0,0 +1,97 @@
+"""Convert Nbody6++GPU HDF5 snapshots into scaled NEMO snapshots or
+columnar stores in a single pass."""
+
+from pathlib import Path
+from typing import Iterator
+from typing import Union
+
+import numpy as np
+
+from ..nemofile import write_store
+from .run import NBodyRun
+
+# scale coefficients for N-body units, see `utils.nbody6_log.load_scaling`
+_SCALINGS_TYPE = dict[str, float]
+
+
+def _scaled_frames(
+    run: NBodyRun,
+    scalings: _SCALINGS_TYPE,
+) -> Iterator[tuple[float, dict[str, np.ndarray]]]:
+    """Yield (time, frame) for all groups of the run in time order, frames
+    have 'mass', 'pos', 'vel' and 'key' (particle names) of single
+    particles."""
+    for snap in run:
+        pos = np.column_stack([snap.X1, snap.X2, snap.X3])
+        vel = np.column_stack([snap.V1, snap.V2, snap.V3])
+        pos *= scalings["R*"]
+        vel *= scalings["V*"]
+        yield snap.TTOT * scalings["T*"], {
+            "mass": snap.M * scalings["M*"],
+            "pos": pos,
+            "vel": vel,
+            "key": snap.Name,
+        }
+
+
+def h5part_to_nemo(
+    run_dir: Union[str, Path],
+    outfile: Union[str, Path],
+    scalings: _SCALINGS_TYPE,
+):
+    """Write all snap.40_*.h5part groups of a run into a NEMO snapshot in
+    astrophysical units.
+
+    Replaces 'cat conf.3_* | u3tos' and rescaling of the result with
+    'postprocess_snap.py': groups are read one by one in time order,
+    scaled and written, so memory is bounded by a single group.
+
+    Only single particles are written: HDF5 output has no positions of
+    binary and merger components.
+
+    Parameters
+    ----------
+    run_dir : Union[str, Path]
+        Directory with snap.40_*.h5part files.
+    outfile : Union[str, Path]
+        Output NEMO file.
+    scalings : dict[str, float]
+        Scale coefficients 'R*', 'M*', 'V*', 'T*' (see `utils.nbody6_log.load_scaling`).
+    """
+    import agama  # needed only to write NEMO files
+
+    run = NBodyRun(run_dir, max_open_files=1)
+    try:
+        with agama.NemoFile(str(outfile), "w") as out:
+            for t, frame in _scaled_frames(run, scalings):
+                out.write(
+                    {
+                        "Time": t,
+                        "Mass": frame["mass"],
+                        "Position": frame["pos"],
+                        "Velocity": frame["vel"],
+                    }
+                )
+    finally:
+        run.close()
+
+
+def h5part_to_store(
+    run_dir: Union[str, Path],
+    store_dir: Union[str, Path],
+    scalings: _SCALINGS_TYPE,
+) -> Path:
+    """Write all snap.40_*.h5part groups of a run into a columnar store
+    (see `utils.nemofile.SnapStore`) in astrophysical units.
+
+    Same as `h5part_to_nemo`, particle names are stored as keys. The
+    run is read once: frame sizes are taken from N_SINGLE of the time index.
+    """
+    run = NBodyRun(run_dir, max_open_files=1)
+    try:
+        nobj = run.n_singles()
+        times = run.times() * scalings["T*"]
+        frames = (frame for _, frame in _scaled_frames(run, scalings))
+        return write_store(store_dir, run_dir, times, nobj, frames)
+    finally:
+        run.close()
@@ -116,3 +116,39 @@ _MERGER_PARTICLE_HR_MAP = {
     "245": "Mer KW2",
     "246": "Mer KW3",
 }
+
+# labels -> field names of structured binary and merger tables
+_BINARY_TABLE_FIELDS = {
+    "Bin M1*": "M1",
+    "Bin M2*": "M2",
+    "Bin A[au]": "A",
+    "Bin ECC": "ECC",
+    "Bin P[d]": "P",
+    "Bin G": "G",
+    "Bin Name1": "Name1",
+    "Bin Name2": "Name2",
+    "ASPN1": "ASPN1",
+    "ASPN2": "ASPN2",
+    "Bin KW1": "KW1",
+    "Bin KW2": "KW2",
+}
+
+_MERGER_TABLE_FIELDS = {
+    "Mer M1": "M1",
+    "Mer M2": "M2",
+    "Mer M3": "M3",
+    "Mer A0[au]": "A0",
+    "Mer ECC0": "ECC0",
+    "Mer P0[d]": "P0",
+    "Mer A1[au]": "A1",
+    "Mer ECC1": "ECC1",
+    "Mer P1[d]": "P1",
+    "Mer KWC": "KWC",
+    "Mer NAM1": "NAM1",
+    "Mer NAM2": "NAM2",
+    "Mer NAM3": "NAM3",
+    "Mer NAMC": "NAMC",
+    "Mer KW1": "KW1",
+    "Mer KW2": "KW2",
+    "Mer KW3": "KW3",
+}
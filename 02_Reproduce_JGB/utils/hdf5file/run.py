@@ -0,0 +1,275 @@
+"""Access Nbody6++GPU HDF5 snapshots of a whole run (all snap.40_*.h5part
+files in a directory)."""
+
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from ..parallel import parallel_map
+from .snapshot import _NAME_COLUMNS
+from .snapshot import NBodySnapshot
+from .snapshot import _search_time
+from .summary import frame_summary
+
+_SNAP_GLOB = "snap.40_*.h5part"
+
+# particle table -> columns with mass, spin and stellar type of its particles
+_HISTORY_COLUMNS = {
+    "single": {"mass": "M", "aspn": "ASPN", "kw": "KW"},
+    "binary1": {"mass": "Bin M1*", "aspn": "ASPN1", "kw": "Bin KW1"},
+    "binary2": {"mass": "Bin M2*", "aspn": "ASPN2", "kw": "Bin KW2"},
+    "merger1": {"mass": "Mer M1", "kw": "Mer KW1"},
+    "merger2": {"mass": "Mer M2", "kw": "Mer KW2"},
+    "merger3": {"mass": "Mer M3", "kw": "Mer KW3"},
+}
+
+
+class ParticleHistory(NamedTuple):
+    """Time series for K particles over T groups (in units of the hdf5
+    files).
+
+    Values are NaN (KW is -1, table is '') when a particle is absent
+    or the quantity is not stored for its table, e.g. positions and
+    velocities are stored for singles only.
+    """
+
+    names: np.ndarray  # [K]
+    times: np.ndarray  # [T] TTOT
+    pos: np.ndarray  # [T, K, 3] relative to the density center
+    vel: np.ndarray  # [T, K, 3]
+    mass: np.ndarray  # [T, K]
+    aspn: np.ndarray  # [T, K] spin
+    kw: np.ndarray  # [T, K] stellar type
+    table: np.ndarray  # [T, K] 'single', 'binary1', ..., see NBodySnapshot.find_names
+
+
+def _summarize_groups(
+    func: Callable[[NBodySnapshot], dict],
+    task: tuple[Path, list[int]],
+    **snapshot_kwargs,
+) -> list[dict]:
+    # runs in a worker process with its own file handle
+    filepath, positions = task
+    snap = NBodySnapshot(filepath, **snapshot_kwargs)
+    try:
+        return [func(snap[position]) for position in positions]
+    finally:
+        snap.close()
+
+
+class NBodyRun:
+    """Snapshots of a run spread over several h5part files.
+
+    The run directory is scanned once to build a global time index over
+    all groups of all files, lookups by time are binary searches across
+    file boundaries. At most `max_open_files` files are kept open, the
+    least recently used one is closed first.
+
+    Every file is served by a single `NBodySnapshot`, so selecting another
+    group of the same file changes the previously returned snapshot.
+    `snapshot_kwargs` are passed to `NBodySnapshot`, e.g. `compact=True`.
+    """
+
+    def __init__(
+        self,
+        run_dir: Union[str, Path],
+        max_open_files: int = 8,
+        **snapshot_kwargs,
+    ):
+        if max_open_files < 1:
+            raise RuntimeError(
+                f"max_open_files should be positive, got {max_open_files}"
+            )
+
+        self.run_dir = Path(run_dir)
+        self.max_open_files = max_open_files
+        self._snapshot_kwargs = snapshot_kwargs
+        self._open = OrderedDict()  # file number -> None, in order of use
+
+        self.snapshots = []
+        times, n_single, files, positions = [], [], [], []
+        for filepath in sorted(self.run_dir.glob(_SNAP_GLOB)):
+            snap = NBodySnapshot(filepath, **snapshot_kwargs)
+            _, file_times = snap._time_index()
+            n_single.append(snap.n_singles())
+            snap.close()
+
+            times.append(file_times)
+            files.append(np.full(file_times.size, len(self.snapshots)))
+            positions.append(np.arange(file_times.size))
+            self.snapshots.append(snap)
+
+        if not self.snapshots:
+            raise RuntimeError(f"No {_SNAP_GLOB} files in {self.run_dir}")
+
+        times = np.concatenate(times)
+        order = np.argsort(times, kind="stable")
+        self._times = times[order]
+        self._n_single = np.concatenate(n_single)[order]
+        self._files = np.concatenate(files)[order]
+        self._positions = np.concatenate(positions)[order]
+
+    def __len__(self):
+        return self._times.size
+
+    def __getitem__(self, i: int) -> NBodySnapshot:
+        """Select the i-th group of the run in time order."""
+        i = range(len(self))[i]  # support negative indices, check bounds
+        snap = self._snapshot(int(self._files[i]))
+        return snap[int(self._positions[i])]
+
+    def __iter__(self):
+        """Iterate over all groups of the run in time order."""
+        for i in range(len(self)):
+            yield self[i]
+
+    def _snapshot(self, file_number: int) -> NBodySnapshot:
+        self._open[file_number] = None
+        self._open.move_to_end(file_number)
+        while len(self._open) > self.max_open_files:
+            oldest, _ = self._open.popitem(last=False)
+            self.snapshots[oldest].close()
+        return self.snapshots[file_number]
+
+    def times(self) -> np.ndarray:
+        """TTOT of all groups in ascending order."""
+        return self._times.copy()
+
+    def n_singles(self) -> np.ndarray:
+        """N_SINGLE of all groups in time order."""
+        return self._n_single.copy()
+
+    def at_time(self, t: float, nearest: bool = True) -> NBodySnapshot:
+        """Select the group with TTOT nearest to `t` (or equal to `t` if
+        `nearest` is False)."""
+        return self[_search_time(self._times, t, nearest=nearest)]
+
+    def after_time(self, t: float) -> NBodySnapshot:
+        """Select the first group with TTOT strictly after `t`."""
+        i = int(np.searchsorted(self._times, t, side="right"))
+        if i == len(self):
+            raise RuntimeError(f"No snapshot after TTOT={t} in {self.run_dir}")
+        return self[i]
+
+    def particle_history(self, names: Iterable[int]) -> ParticleHistory:
+        """Extract time series of given particles in one pass over the run.
+
+        Output arrays are allocated once, every group is visited once in
+        time order and only the columns of tables which contain requested
+        particles are read.
+
+        Parameters
+        ----------
+        names : Iterable[int]
+            Particle names (e.g. black holes).
+        Returns
+        -------
+        ParticleHistory
+        """
+        names = np.unique(np.fromiter(names, dtype=np.int64))
+        shape = (len(self), names.size)
+        history = ParticleHistory(
+            names=names,
+            times=self.times(),
+            pos=np.full((*shape, 3), np.nan),
+            vel=np.full((*shape, 3), np.nan),
+            mass=np.full(shape, np.nan),
+            aspn=np.full(shape, np.nan),
+            kw=np.full(shape, -1, dtype=np.int32),
+            table=np.full(shape, "", dtype=f"<U{max(map(len, _NAME_COLUMNS))}"),
+        )
+
+        for i, snap in enumerate(self):
+            tables, rows = snap.find_names(names)
+            history.table[i] = tables
+
+            for table in np.unique(tables[tables != ""]):
+                mask = tables == table
+                table_rows = rows[mask]
+                for field, column in _HISTORY_COLUMNS[table].items():
+                    values = getattr(snap, column, None)  # no HR data
+                    if values is not None:
+                        getattr(history, field)[i, mask] = values[table_rows]
+
+                if table == "single":
+                    history.pos[i, mask] = snap.X[table_rows]
+                    history.vel[i, mask] = snap.V[table_rows]
+
+        return history
+
+    def summarize(
+        self,
+        func: Callable[[NBodySnapshot], dict] = frame_summary,
+        jobs: int = 1,
+        cache=None,
+    ) -> pd.DataFrame:
+        """Apply `func` to every group of the run and collect the results
+        into a table.
+
+        Groups are processed per file in a process pool, every worker opens
+        its own file handle (see `utils.parallel.parallel_map`).
+
+        Parameters
+        ----------
+        func : Callable[[NBodySnapshot], dict]
+            Summary of a single group, a picklable function returning a dict of scalars.
+            Default: `frame_summary`.
+        jobs :
+            The number of worker processes, 0 means all cores. Default: 1.
+        cache : Optional[utils.cache.ResultCache]
+            Cache for per-group results. Default: None (no caching).
+        Returns
+        -------
+        pd.DataFrame
+            One row per group in time order.
+        """
+        func_name = f"{func.__module__}.{func.__qualname__}"
+        filepaths = [snap.filepath for snap in self.snapshots]
+
+        results = [None] * len(self)
+        keys = [None] * len(self)
+        if cache is not None:
+            for i, t in enumerate(self._times):
+                keys[i] = cache.key(
+                    filepaths[self._files[i]],
+                    t,
+                    summary=func_name,
+                    snapshot_kwargs=self._snapshot_kwargs,
+                )
+                results[i] = cache.get(keys[i])
+
+        # missing groups of every file
+        missing = {}
+        for i, result in enumerate(results):
+            if result is None:
+                missing.setdefault(int(self._files[i]), []).append(i)
+
+        tasks = parallel_map(
+            partial(_summarize_groups, func, **self._snapshot_kwargs),
+            [
+                (filepaths[file_number], [int(self._positions[i]) for i in indices])
+                for file_number, indices in missing.items()
+            ],
+            jobs=jobs,
+        )
+        for indices, task in zip(missing.values(), tasks):
+            if task.error is not None:
+                raise task.error
+            for i, result in zip(indices, task.value):
+                results[i] = result
+                if cache is not None:
+                    cache.put(keys[i], result)
+
+        return pd.DataFrame(results)
+
+    def close(self):
+        for file_number in self._open:
+            self.snapshots[file_number].close()
+        self._open.clear()
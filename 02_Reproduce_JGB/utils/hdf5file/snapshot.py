@@ -1,49 +1,297 @@
 """Load and access Nbody6++GPU HDF5 snapshot data."""
 
 import warnings
+from typing import Callable
+from typing import Iterable
+from typing import Optional
 
 import h5py
 import numpy as np
 
 from .mapping import _BINARY_PARTICLE_HR_MAP
 from .mapping import _BINARY_PARTICLE_MAP
+from .mapping import _BINARY_TABLE_FIELDS
 from .mapping import _MERGER_PARTICLE_HR_MAP
 from .mapping import _MERGER_PARTICLE_MAP
+from .mapping import _MERGER_TABLE_FIELDS
 from .mapping import _SCALAR_MAP
 from .mapping import _SINGLE_PARTICLE_HR_MAP
 from .mapping import _SINGLE_PARTICLE_MAP
 
+# attribute name -> dataset code for all particle data
+_PARTICLE_CODES = {
+    label: code
+    for mapping in (
+        _SINGLE_PARTICLE_MAP,
+        _SINGLE_PARTICLE_HR_MAP,
+        _BINARY_PARTICLE_MAP,
+        _BINARY_PARTICLE_HR_MAP,
+        _MERGER_PARTICLE_MAP,
+        _MERGER_PARTICLE_HR_MAP,
+    )
+    for code, label in mapping.items()
+}
+_HR_LABELS = {
+    *_SINGLE_PARTICLE_HR_MAP.values(),
+    *_BINARY_PARTICLE_HR_MAP.values(),
+    *_MERGER_PARTICLE_HR_MAP.values(),
+}
+_BINARY_LABELS = {*_BINARY_PARTICLE_MAP.values(), *_BINARY_PARTICLE_HR_MAP.values()}
+_MERGER_LABELS = {*_MERGER_PARTICLE_MAP.values(), *_MERGER_PARTICLE_HR_MAP.values()}
+_HR_PROBE = "031 KW"  # present only if stellar evolution data is stored
+
+# positions of TTOT and N_SINGLE in '000 Scalars' (see `_SCALAR_MAP`)
+_INDEX_SCALARS = [0, 67]
+
+# tables of particles (singles, binary and merger components) -> name column
+_NAME_COLUMNS = {
+    "single": "Name",
+    "binary1": "Bin Name1",
+    "binary2": "Bin Name2",
+    "merger1": "Mer NAM1",
+    "merger2": "Mer NAM2",
+    "merger3": "Mer NAM3",
+}
+_NAME_TABLES = np.array(list(_NAME_COLUMNS))
+
+_SELECT_CHUNK_SIZE = 2**20  # rows per chunk in `NBodySnapshot.select`
+_POINT_SELECTION_MAX = 1000  # read fewer matching rows of a chunk point by point
+
+
+def _search_time(times: np.ndarray, t: float, nearest: bool = True) -> int:
+    """Index of the element of sorted `times` matching `t`: either the
+    nearest one or the one equal to `t` (up to np.isclose)."""
+    if times.size == 0:
+        raise RuntimeError("No snapshots to search in")
+
+    i = int(np.searchsorted(times, t))
+    candidates = [j for j in (i - 1, i) if 0 <= j < times.size]
+    best = min(candidates, key=lambda j: abs(times[j] - t))
+    if not nearest and not np.isclose(times[best], t):
+        raise RuntimeError(f"No snapshot with TTOT={t}")
+    return best
+
 
 class NBodySnapshot:
     """Iterator to load and access Nbody6++GPU HDF5 snapshot data.
 
-    Parses scalar parameters and particle data (singles and binaries).
+    Parses scalar parameters on every step. Particle data (singles,
+    binaries and mergers) is read from the file on first attribute access
+    (e.g. `snap.ASPN`), derived quantities (X, V, RR, VV, LZ_spec, LZ) are
+    computed on first use. Both are kept until the next step.
+
+    Besides iteration in file order, groups can be selected in time order
+    with `snap[i]` or by time with `snap.at_time(t)`.
+
+    Binaries and mergers are also available as structured arrays
+    `snap.binaries` and `snap.mergers` (use `pd.DataFrame(snap.binaries)`
+    for a table).
+
+    In compact mode coordinates are read straight into (N, 3) buffers
+    which are reused for every group, as well as buffers of other derived
+    quantities, so streaming through a run does not allocate new arrays.
+    Derived arrays are then overwritten on the next step: copy them to
+    keep. `dtype` (e.g. np.float32) applies to floating point columns
+    and buffers.
     """
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, compact: bool = False, dtype=None):
         self.filepath = filepath
+        self.compact = compact
+        self.dtype = dtype
+        self._buffers = {}
 
     def __iter__(self):
-        self._load_file()
-        self._key_iter = iter(self._f.keys())
+        self._key_iter = iter(self._file().keys())
         return self
 
     def _load_file(self):
         self._f = h5py.File(self.filepath, "r")
 
+    def _file(self) -> h5py.File:
+        if "_f" not in self.__dict__ or not self._f:  # not opened yet or closed
+            self._load_file()
+        return self._f
+
+    def _time_index(self) -> tuple[list[str], np.ndarray]:
+        """Group keys and their TTOT sorted by time (cached).
+
+        Only TTOT and N_SINGLE are read from '000 Scalars' of every group.
+        """
+        if "_index" not in self.__dict__:
+            f = self._file()
+            keys = list(f.keys())
+            scalars = np.array(
+                [f[key]["000 Scalars"][_INDEX_SCALARS] for key in keys]
+            ).reshape(-1, len(_INDEX_SCALARS))
+            order = np.argsort(scalars[:, 0], kind="stable")  # TTOT
+            self._index = [keys[i] for i in order], scalars[order, 0]
+            self._n_single = scalars[order, 1].astype(np.int64)
+        return self._index
+
+    def __len__(self):
+        return len(self._time_index()[0])
+
+    def __getitem__(self, i: int):
+        """Select the i-th group in time order."""
+        keys, _ = self._time_index()
+        self._set_group(self._file()[keys[i]])
+        return self
+
+    def times(self) -> np.ndarray:
+        """TTOT of all groups in ascending order."""
+        return self._time_index()[1].copy()
+
+    def n_singles(self) -> np.ndarray:
+        """N_SINGLE of all groups in time order (read with the time index)."""
+        self._time_index()
+        return self._n_single.copy()
+
+    def at_time(self, t: float, nearest: bool = True):
+        """Select the group with TTOT nearest to `t` (or equal to `t` if
+        `nearest` is False) using binary search over the time index."""
+        return self[_search_time(self._time_index()[1], t, nearest=nearest)]
+
     def __next__(self):
         key = next(self._key_iter)
-        self.group = self._f[key]
-        self._parse_scalars()
-        self._parse_particles()
+        self._set_group(self._f[key])
         return self
 
-    def _read(self, id_str, name):
-        return self.group[f"{id_str} {name}"][:]
+    def _set_group(self, group):
+        self.group = group
+        self._data = {}  # particle data and derived quantities of this group
+        self._parse_scalars()
+
+        self._hr_empty = _HR_PROBE not in group
+        if self._hr_empty:
+            warnings.warn(
+                "Found no stellar evolution data. To enable HR output, adjust KZ(12)"
+            )
+
+    def _dataset(self, name) -> h5py.Dataset:
+        if name not in _PARTICLE_CODES:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        if (
+            (name in _HR_LABELS and self._hr_empty)
+            or (name in _BINARY_LABELS and not self.scalars["N_BINARY"])
+            or (name in _MERGER_LABELS and not self.scalars["N_MERGER"])
+        ):
+            raise AttributeError(f"No '{name}' data in group {self.group.name}")
+        return self.group[f"{_PARTICLE_CODES[name]} {name}"]
+
+    def __getattr__(self, name):
+        # called only for attributes which are not set yet
+        data = self.__dict__.get("_data")
+        if data is None or name.startswith("__"):
+            raise AttributeError(name)
+        if name not in data:
+            try:
+                data[name] = self._load(name)
+            except KeyError:  # no such dataset in the group
+                raise AttributeError(name)
+        return data[name]
+
+    def _load(self, name):
+        derive = getattr(type(self), f"_derive_{name}", None)
+        if derive is not None:
+            return derive(self)
+
+        dataset = self._dataset(name)
+        if self.dtype is not None and dataset.dtype.kind == "f":
+            return dataset.astype(self.dtype)[:]
+        return dataset[:]
+
+    def _buffer(self, name, shape) -> np.ndarray:
+        """Reusable array for compact mode, grown when a group has more particles."""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape[0] < shape[0]:
+            buffer = np.empty(shape, dtype=self.dtype or np.float64)
+            self._buffers[name] = buffer
+        return buffer[: shape[0]]
+
+    def _read_vectors(self, name, columns) -> np.ndarray:
+        """Read columns into (N, 3) buffer."""
+        n = self._dataset(columns[0]).shape[0]
+        vectors = self._buffer(name, (n, 3))
+        for j, column in enumerate(columns):
+            self._dataset(column).read_direct(vectors, dest_sel=np.s_[:, j])
+        return vectors
+
+    def select(
+        self,
+        where: Callable[[dict[str, np.ndarray]], np.ndarray],
+        using: Iterable[str],
+        columns: Iterable[str],
+        chunk_size: int = _SELECT_CHUNK_SIZE,
+    ) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """Read only rows of particle data matching a predicate.
+
+        The predicate is evaluated chunk by chunk on `using` columns only,
+        then matching rows of `columns` are read with point selection (a
+        few rows) or a hyperslab of the chunk, so memory is proportional
+        to the chunk size and the selection. Already loaded columns are not
+        read again.
 
-    def _load_mapping(self, mapping):
-        for code, label in mapping.items():
-            setattr(self, label, self._read(code, label))
+        Parameters
+        ----------
+        where : Callable[[dict[str, np.ndarray]], np.ndarray]
+            Gets chunks of `using` columns by their names and returns a boolean mask,
+            e.g. `lambda c: c["KW"] == 14` for black holes.
+        using : Iterable[str]
+            Columns needed by `where`, e.g. ["KW"] or ["X1", "X2", "X3"].
+        columns : Iterable[str]
+            Columns to read for matching rows, e.g. ["Name", "M", "ASPN"].
+            All columns should belong to the same table (singles, binaries or mergers).
+        chunk_size :
+            The number of rows to evaluate `where` on at once. Default: 2**20.
+        Returns
+        -------
+        tuple[np.ndarray, dict[str, np.ndarray]]
+            Indices of matching rows and selected data of `columns`.
+        """
+        using, columns = list(using), list(columns)
+        sizes = {self._dataset(name).shape[0] for name in using + columns}
+        if len(sizes) != 1:
+            raise RuntimeError(f"Columns {using + columns} have different lengths")
+        (n,) = sizes
+
+        rows, parts = [], {name: [] for name in columns}
+        for start in range(0, n, chunk_size):
+            chunk = slice(start, min(start + chunk_size, n))
+            values = {name: self._column_chunk(name, chunk) for name in using}
+            mask = np.asarray(where(values), dtype=bool)
+            chunk_rows = np.flatnonzero(mask) + start
+            if chunk_rows.size == 0:
+                continue
+
+            rows.append(chunk_rows)
+            for name in columns:
+                if name in values:
+                    parts[name].append(values[name][mask])
+                elif name in self._data:
+                    parts[name].append(self._data[name][chunk_rows])
+                elif chunk_rows.size <= _POINT_SELECTION_MAX:
+                    parts[name].append(self._dataset(name)[chunk_rows])
+                else:
+                    parts[name].append(self._dataset(name)[chunk][mask])
+
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        data = {
+            name: (
+                np.concatenate(parts[name])
+                if parts[name]
+                else np.empty(0, dtype=self._dataset(name).dtype)
+            )
+            for name in columns
+        }
+        return rows, data
+
+    def _column_chunk(self, name, chunk: slice) -> np.ndarray:
+        if name in self._data:
+            return self._data[name][chunk]
+        return self._dataset(name)[chunk]
 
     def _parse_scalars(self):
         S = self.group["000 Scalars"][:]
@@ -53,41 +301,174 @@ class NBodySnapshot:
         self.N = int(self.scalars["N"])
         self.RDENS = np.array([self.scalars[f"RDENS{i}"] for i in (1, 2, 3)])
 
-    def _parse_particles(self):
-        # Load single particle data
-        self._load_mapping(_SINGLE_PARTICLE_MAP)
-        # Try to load stellar evolution data
-        try:
-            self._load_mapping(_SINGLE_PARTICLE_HR_MAP)
-            self._hr_empty = False
-        except:
-            warnings.warn(
-                "Found no stellar evolution data. To enable HR output, adjust KZ(12)"
+    # derived quantities, see `_load`
+
+    def _derive_X(self):
+        if self.compact:
+            X = self._read_vectors("X", ("X1", "X2", "X3"))
+            X -= self.RDENS
+            return X
+        return np.stack([self.X1, self.X2, self.X3], axis=1) - self.RDENS
+
+    def _derive_V(self):
+        if self.compact:
+            return self._read_vectors("V", ("V1", "V2", "V3"))
+        return np.stack([self.V1, self.V2, self.V3], axis=1)
+
+    def _norm(self, name, vectors) -> np.ndarray:
+        if not self.compact:
+            return np.linalg.norm(vectors, axis=1)
+        norm = self._buffer(name, vectors.shape[:1])
+        np.einsum("ij,ij->i", vectors, vectors, out=norm)
+        return np.sqrt(norm, out=norm)
+
+    def _derive_RR(self):
+        return self._norm("RR", self.X)
+
+    def _derive_VV(self):
+        return self._norm("VV", self.V)
+
+    def _derive_LZ_spec(self):
+        X, V = self.X, self.V
+        if not self.compact:
+            return np.sqrt(X[:, 0] ** 2 + X[:, 1] ** 2) * np.sqrt(
+                V[:, 0] ** 2 + V[:, 1] ** 2
+            )
+        lz_spec = np.hypot(X[:, 0], X[:, 1], out=self._buffer("LZ_spec", X.shape[:1]))
+        lz_spec *= np.hypot(V[:, 0], V[:, 1], out=self._buffer("tmp", V.shape[:1]))
+        return lz_spec
+
+    def _derive_LZ(self):
+        if self.compact:
+            return np.multiply(
+                self.M, self.LZ_spec, out=self._buffer("LZ", self.M.shape)
+            )
+        return self.M * self.LZ_spec
+
+    def _table(self, fields: dict[str, str], size_scalar: str) -> np.ndarray:
+        """Structured array with columns `fields` (label -> field name) of
+        the table which size is given by `size_scalar`."""
+        labels = [
+            label for label in fields if not (label in _HR_LABELS and self._hr_empty)
+        ]
+        if not self.scalars[size_scalar]:  # names and stellar types are integers
+            return np.empty(
+                0,
+                dtype=[
+                    (
+                        fields[label],
+                        (
+                            "i8"
+                            if fields[label].startswith(("Name", "NAM", "KW"))
+                            else "f8"
+                        ),
+                    )
+                    for label in labels
+                ],
             )
-            self._hr_empty = True
-
-        # Load binaries
-        if self.scalars["N_BINARY"]:
-            self._load_mapping(_BINARY_PARTICLE_MAP)
-            if not self._hr_empty:
-                self._load_mapping(_BINARY_PARTICLE_HR_MAP)
-
-        # Load mergers
-        if self.scalars["N_MERGER"]:
-            self._load_mapping(_MERGER_PARTICLE_MAP)
-            if not self._hr_empty:
-                self._load_mapping(_MERGER_PARTICLE_HR_MAP)
-
-        self.X = np.stack([self.X1, self.X2, self.X3], axis=1) - self.RDENS
-        self.V = np.stack([self.V1, self.V2, self.V3], axis=1)
-
-        # derived
-        self.RR = np.linalg.norm(self.X, axis=1)
-        self.VV = np.linalg.norm(self.V, axis=1)
-        self.LZ_spec = np.sqrt(self.X[:, 0] ** 2 + self.X[:, 1] ** 2) * np.sqrt(
-            self.V[:, 0] ** 2 + self.V[:, 1] ** 2
+
+        datasets = {label: self._dataset(label) for label in labels}
+        dtypes = {
+            label: (
+                self.dtype
+                if self.dtype is not None and dataset.dtype.kind == "f"
+                else dataset.dtype
+            )
+            for label, dataset in datasets.items()
+        }
+        table = np.empty(
+            datasets[labels[0]].shape[0],
+            dtype=[(fields[label], dtypes[label]) for label in labels],
         )
-        self.LZ = self.M * self.LZ_spec
+        for label, dataset in datasets.items():
+            if label in self._data:  # already loaded as an attribute
+                table[fields[label]] = self._data[label]
+            else:
+                table[fields[label]] = dataset[:]
+        return table
+
+    def _derive_binaries(self):
+        return self._table(_BINARY_TABLE_FIELDS, "N_BINARY")
+
+    def _derive_mergers(self):
+        return self._table(_MERGER_TABLE_FIELDS, "N_MERGER")
+
+    def join_singles(self, names, columns: Iterable[str]) -> dict[str, np.ndarray]:
+        """Values of single particle `columns` for particles with given
+        names (vectorized join by name, see `find_names`).
+
+        E.g. `snap.join_singles(snap.mergers["NAM1"], ["M", "ASPN"])`.
+        Particles which are not singles get NaN (-1 for integer columns).
+        """
+        tables, rows = self.find_names(names)
+        is_single = tables == "single"
+
+        result = {}
+        for column in columns:
+            values = getattr(self, column)
+            joined = np.full(
+                is_single.shape,
+                np.nan if values.dtype.kind == "f" else -1,
+                dtype=values.dtype,
+            )
+            joined[is_single] = values[rows[is_single]]
+            result[column] = joined
+        return result
+
+    def _derive_name_index(self):
+        """Sorted names with their table number (in `_NAME_COLUMNS`) and row."""
+        names, tables, rows = [], [], []
+        for table, column in enumerate(_NAME_COLUMNS.values()):
+            column = getattr(self, column, None)  # no binaries or mergers
+            if column is None:
+                continue
+            names.append(column)
+            tables.append(np.full(column.size, table, dtype=np.int8))
+            rows.append(np.arange(column.size))
+
+        names = np.concatenate(names)
+        order = np.argsort(names, kind="stable")  # singles first for duplicates
+        return names[order], np.concatenate(tables)[order], np.concatenate(rows)[order]
+
+    def find_names(self, names) -> tuple[np.ndarray, np.ndarray]:
+        """Find tables and rows of particles by their names.
+
+        Uses name index (built on first call for the current group) with
+        binary search, so looking up many names at once is cheap.
+
+        Parameters
+        ----------
+        names : array_like
+            Particle names.
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Tables ('single', 'binary1', 'binary2', 'merger1', 'merger2', 'merger3'
+            where the number is a component) and rows in these tables, e.g. for
+            'binary2' use `getattr(snap, "Bin Name2")[row]`, `snap.ASPN2[row]`.
+            Missing names have table '' and row -1.
+        """
+        index_names, index_tables, index_rows = self.name_index
+        names = np.asarray(names)
+        if index_names.size == 0:
+            return np.full(names.shape, ""), np.full(names.shape, -1)
+
+        pos = np.minimum(np.searchsorted(index_names, names), index_names.size - 1)
+        found = index_names[pos] == names
+
+        tables = np.where(found, _NAME_TABLES[index_tables[pos]], "")
+        rows = np.where(found, index_rows[pos], -1)
+        return tables, rows
+
+    def find_name(self, name) -> Optional[tuple[str, int]]:
+        """Find table and row of a particle by its name (see `find_names`).
+
+        Returns None if there is no such particle.
+        """
+        tables, rows = self.find_names([name])
+        if not tables[0]:
+            return None
+        return str(tables[0]), int(rows[0])
 
     def close(self):
         self._f.close()
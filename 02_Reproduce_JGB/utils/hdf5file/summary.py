@@ -0,0 +1,55 @@
+"""Per-group summaries of Nbody6++GPU HDF5 snapshots."""
+
+import numpy as np
+
+from .snapshot import NBodySnapshot
+
+_BH_KW = 14  # stellar type of black holes
+_KW_COLUMNS = ("KW", "Bin KW1", "Bin KW2", "Mer KW1", "Mer KW2", "Mer KW3")
+_MASS_COLUMNS = ("M", "Bin M1*", "Bin M2*", "Mer M1", "Mer M2", "Mer M3")
+
+
+def half_mass_radius(radii: np.ndarray, masses: np.ndarray) -> float:
+    """Radius containing half of the total mass."""
+    if radii.size == 0:
+        return np.nan
+    order = np.argsort(radii)
+    cumsum = np.cumsum(masses[order])
+    i = min(np.searchsorted(cumsum, 0.5 * cumsum[-1]), radii.size - 1)
+    return float(radii[order][i])
+
+
+def frame_summary(snap: NBodySnapshot) -> dict[str, float]:
+    """Particle numbers, total mass (singles and components of binaries
+    and mergers), mass and half-mass radius of single particles (about
+    RDENS) and the number of black holes (KW=14) in the current group,
+    in units of the hdf5 file.
+
+    The half-mass radius covers singles only: the hdf5 output has no
+    positions of binaries and mergers. BH count is NaN without stellar
+    evolution data.
+    """
+    if snap._hr_empty:
+        n_bh = np.nan
+    else:
+        n_bh = sum(
+            np.count_nonzero(getattr(snap, column) == _BH_KW)
+            for column in _KW_COLUMNS
+            if getattr(snap, column, None) is not None
+        )
+
+    return {
+        "TTOT": float(snap.TTOT),
+        "N": snap.N,
+        "N_SINGLE": int(snap.scalars["N_SINGLE"]),
+        "N_BINARY": int(snap.scalars["N_BINARY"]),
+        "N_MERGER": int(snap.scalars["N_MERGER"]),
+        "M_TOTAL": sum(
+            float(np.sum(getattr(snap, column)))
+            for column in _MASS_COLUMNS
+            if getattr(snap, column, None) is not None
+        ),
+        "M_SINGLE": float(np.sum(snap.M)),
+        "R_HALF": half_mass_radius(snap.RR, snap.M),
+        "N_BH": n_bh,
+    }
@@ -1,11 +1,18 @@
 """Based on this jupyter-notebook: https://github.com/nbody6ppgpu/Nbody6PPGPU-beijing/blob/stable/examples/01_Basics.ipynb"""
 
+import hashlib
+import json
+import os
 import re
 import warnings
+import zipfile
+from functools import partial
 from pathlib import Path
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
@@ -14,7 +21,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-_OUTPUT_DATA = {
+from .parallel import parallel_map
+
+_OUTPUT_DATA = {  # update _is_record when changed
     "RLAGR",
     "AVMASS",
     "NPARTC",
@@ -82,6 +91,14 @@ _COLS = [0.01, 0.1, 0.3, 0.5, 0.9, 1.0, "<RC"]
 
 # Precompile regexes used repeatedly
 _KEYVAL_RE = re.compile(r"([A-Z]+)\s*=\s*([0-9Ee\+\-\.]+)")
+_OUTPUT_RE = re.compile("|".join(sorted(_OUTPUT_DATA)))
+_HDF5_RE = re.compile(
+    r"TTOT\s+([0-9.eE+-]+)\s+"
+    r"N_STAR\s+(\d+)\s+"
+    r"N_BINARY\s+(\d+)\s+"
+    r"N_MERGER\s+(\d+)\s+"
+    r"Output reduced 0/1=\s+(\d+)"
+)
 _SCALING_RE = re.compile(
     r"""PHYSICAL\ SCALING:      # literal header
         \s*R\*\s*=\s*([0-9E+.\-]+)   # capture R*
@@ -92,6 +109,11 @@ _SCALING_RE = re.compile(
     re.VERBOSE,
 )
 
+_LOG_CACHE_VERSION = 1
+# bytes before the parsed offset compared to tell an appended log from a replaced one
+_LOG_CACHE_CHECK_BYTES = 64 * 1024
+_MIN_CHUNK_SIZE = 16 * 1024**2  # smaller logs are not split for parallel parsing
+
 
 def _safe_float(token: str) -> float:
     """Convert token to float safely, handling 'D' exponent and malformed
@@ -105,78 +127,381 @@ def _safe_float(token: str) -> float:
             return np.nan
 
 
+def _is_record(line: str) -> bool:
+    """Whether a line may hold data parsed by `LogParser` (STEP, ADJUST,
+    _OUTPUT_DATA or TTOT lines).
+
+    Chained substring tests are several times faster than a regex search,
+    and most lines of a log hold nothing to parse.
+    """
+    return (
+        "ADJUST:" in line
+        or "STEP" in line
+        or "TTOT" in line
+        or "RLAGR" in line
+        or "AVMASS" in line
+        or "NPARTC" in line
+        or "SIGR2" in line
+        or "SIGT2" in line
+        or "VROT" in line
+    )
+
+
+def _safe_floats(tokens: Sequence[str]) -> List[float]:
+    """Convert tokens to floats at once, falling back to `_safe_float` per
+    token if some of them are not plain floats."""
+    try:
+        return list(map(float, tokens))
+    except ValueError:
+        return [_safe_float(token) for token in tokens]
+
+
+def _decode_lines(data: bytes) -> Tuple[str, List[str]]:
+    """Decode bytes of a log into text with universal newlines and its
+    lines."""
+    text = data.decode(errors="replace")
+    if "\r" in text:  # universal newlines, as in text mode
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return text, lines
+
+
+def _search_scaling(lines: Iterable[str]) -> Optional[Dict[str, float]]:
+    """Scale coefficients from the first PHYSICAL SCALING line, if any."""
+    for line in lines:
+        m = _SCALING_RE.search(line)
+        if m:
+            keys = ["R*", "M*", "V*", "T*"]
+            vals = map(float, m.groups())
+            return dict(zip(keys, vals))
+    return None
+
+
 # ——— Data loading ———
 
 
-def parse_log(
-    logfile: Union[str, Path],
-) -> Dict[str, Union[pd.DataFrame, Dict[str, pd.DataFrame], None]]:
-    """Parse an Nbody6++GPU log file in one pass.
+class _GrowableArray:
+    """2D array which grows by appending rows and by writing past the last
+    column. The capacity is doubled when exceeded, so appending a row is
+    amortized O(1). Cells which were never written hold `fill`.
+    """
 
-    Returns dict with keys:
-      - "adjust": DataFrame (index=time)
-      - "output": dict mapping data_type -> DataFrame (columns=_FULL_COLS)
-      - "step": dict mapping 'I'/'R' -> DataFrame, or None if not present
-      - "scaling": dict with keys 'R*','M*','V*','T*' or None
+    def __init__(self, dtype=np.float64, fill=np.nan, width: int = 0):
+        self.n_rows = 0
+        self.n_cols = width
+        self._fill = fill
+        self._data = np.full((64, max(width, 8)), fill, dtype=dtype)
+
+    @property
+    def values(self) -> np.ndarray:
+        """View of the rows and columns in use."""
+        return self._data[: self.n_rows, : self.n_cols]
+
+    def _reserve(self, n_rows: int, n_cols: int):
+        rows, cols = self._data.shape
+        if n_rows <= rows and n_cols <= cols:
+            return
+        data = np.full(
+            (max(n_rows, 2 * rows if n_rows > rows else rows), max(n_cols, cols)),
+            self._fill,
+            dtype=self._data.dtype,
+        )
+        data[:rows, :cols] = self._data
+        self._data = data
+
+    def add_row(self) -> int:
+        """Append a row of `fill` values, return its index."""
+        self._reserve(self.n_rows + 1, self.n_cols)
+        self.n_rows += 1
+        return self.n_rows - 1
+
+    def append(self, values: Sequence):
+        """Append a row starting with `values`, the rest is `fill`."""
+        row = self.add_row()
+        self.set(row, slice(0, len(values)), values)
+
+    def extend(self, rows: List[Sequence]):
+        """Append rows of equal length at once."""
+        if not len(rows):
+            return
+        values = np.array(rows, dtype=self._data.dtype, ndmin=2)
+        start = self.n_rows
+        self._reserve(start + len(values), max(self.n_cols, values.shape[1]))
+        self._data[start : start + len(values), : values.shape[1]] = values
+        self.n_rows += len(values)
+        self.n_cols = max(self.n_cols, values.shape[1])
+
+    def set(self, row: int, cols: Union[slice, List[int]], values: Sequence):
+        """Write `values` into columns `cols` of a row."""
+        stop = cols.stop if isinstance(cols, slice) else max(cols, default=-1) + 1
+        self._reserve(self.n_rows, stop)
+        self.n_cols = max(self.n_cols, stop)
+        self._data[row, cols] = values
+
+    def set_block(self, rows: List[int], cols: List[int], values: np.ndarray):
+        """Write a 2D block of `values` into the given rows and columns."""
+        self._reserve(self.n_rows, max(cols) + 1)
+        self.n_cols = max(self.n_cols, max(cols) + 1)
+        self._data[np.ix_(rows, cols)] = values
+
+    def clear_row(self, row: int):
+        self._data[row] = self._fill
+
+
+class _RowTable:
+    """Rows of named values kept in a `_GrowableArray`, columns are added on
+    first use.
+
+    Rows added with `put` are addressed by a key, a repeated key replaces
+    the values of its row (like a dict of dicts).
     """
-    logfile = Path(logfile)
-    with logfile.open("r") as fh:
-        lines = fh.readlines()
-
-    scaling = load_scaling(logfile)
-
-    pre_etai: Optional[float] = None
-    pre_etar: Optional[float] = None
-    pre_etau: Optional[float] = None
-
-    for i, raw in enumerate(lines[:50]):
-        s = raw.strip()
-        if s.startswith("ETAI") and "ETAR" in s:
-            next_line = lines[i + 2]
-            parts = next_line.split()
-            pre_etai = _safe_float(parts[0])
-            pre_etar = _safe_float(parts[1])
-        elif s.startswith("DTMIN") and "RMIN" in s and "ETAU" in s:
-            next_line = lines[i + 2]
-            parts = next_line.split()
-            pre_etau = _safe_float(parts[2])
-
-    adjust_rows: List[Dict] = []
-    output_rows: Dict[str, List[Tuple[float, List[float]]]] = {
-        name: [] for name in _OUTPUT_DATA
-    }
-    step_lists: Dict[str, List[List[int]]] = {"I": [], "R": []}
-    ks_params: Dict[float, Dict[str, float]] = {}
-    profile_params: Dict[float, Dict[str, float]] = {}
-    eta_params: Dict[float, Dict[str, float]] = {}
-    hdf5_params: Dict[float, Dict[str, float]] = {}
-
-    current_time_idx: Optional[float] = None
-
-    # iterate once
-    for i, raw in enumerate(lines):
-        if not raw.strip():
-            continue
-
-        line = raw.replace("*****", " nan")
-        stripped = line.strip()
-
-        # STEP lines
-        if stripped.startswith("STEP I") or stripped.startswith("STEP R"):
+
+    def __init__(self, dtype=np.float64, fill=np.nan):
+        self.columns: Dict[str, int] = {}
+        self.keys: Dict = {}  # key -> row
+        self._array = _GrowableArray(dtype, fill)
+        # names of values in a row -> their columns, rows usually look alike
+        self._row_columns: Dict[tuple, Union[slice, List[int]]] = {}
+
+    def __len__(self):
+        return self._array.n_rows
+
+    def append(self, values: Dict[str, float]):
+        self._set(self._array.add_row(), values)
+
+    def put(self, key, values: Dict[str, float]):
+        row = self.keys.get(key)
+        if row is None:
+            row = self.keys[key] = self._array.add_row()
+        else:
+            self._array.clear_row(row)
+        self._set(row, values)
+
+    def _set(self, row: int, values: Dict[str, float]):
+        names = tuple(values)
+        cols = self._row_columns.get(names)
+        if cols is None:
+            cols = [self.columns.setdefault(name, len(self.columns)) for name in names]
+            if cols and cols == list(range(cols[0], cols[-1] + 1)):
+                cols = slice(cols[0], cols[-1] + 1)  # faster to write
+            self._row_columns[names] = cols
+        self._array.set(row, cols, list(values.values()))
+
+    def merge(self, other: "_RowTable"):
+        """Add the rows of another table as if they were added to this one
+        with `append` (or `put` if they are keyed)."""
+        if not len(other):
+            return
+        cols = [
+            self.columns.setdefault(name, len(self.columns)) for name in other.columns
+        ]
+        if other.keys:
+            rows = []
+            for key in other.keys:  # in the order of rows
+                row = self.keys.get(key)
+                if row is None:
+                    row = self.keys[key] = self._array.add_row()
+                else:
+                    self._array.clear_row(row)
+                rows.append(row)
+        else:
+            rows = [self._array.add_row() for _ in range(len(other))]
+        self._array.set_block(rows, cols, other._array.values)
+
+    def frame(self) -> pd.DataFrame:
+        """Copy of the table, indexed by keys if rows were added with `put`."""
+        if not len(self):
+            return pd.DataFrame.from_dict({}, orient="index")
+        return pd.DataFrame(
+            self._array.values,
+            index=list(self.keys) if self.keys else None,
+            columns=list(self.columns),
+            copy=True,
+        )
+
+
+class LogParser:
+    """Incremental parser of an Nbody6++GPU log file.
+
+    Every `update` reads only lines appended since the previous call (the
+    byte offset of the first unread line is kept) and adds them to the
+    collected rows, `result` builds the same dict of DataFrames as
+    `parse_log`. An ADJUST block is parsed once all its lines are written,
+    an incomplete block at the end of the file is kept until the next
+    update.
+
+    The file is streamed in blocks of `_READ_SIZE` bytes. Lines of a block
+    are classified with cheap substring checks first, so most lines cost
+    a few `in` tests. Only an ADJUST block which is not fully read is
+    carried over to the next block. Rows are collected in growable numpy
+    arrays, so memory does not depend on the log size, only on the number
+    of rows.
+    """
+
+    _READ_SIZE = 4 * 1024**2  # bytes read and parsed at once
+    _HEADER_LINES = 52  # header values are searched in the first 50 lines + 2
+    _ADJUST_LINES = 6  # ADJUST line and 5 lines of its block
+
+    def __init__(self, logfile: Union[str, Path]):
+        self.logfile = Path(logfile)
+        self.offset = 0  # bytes consumed so far
+
+        self.scaling: Optional[Dict[str, float]] = None
+        self.pre_etai: Optional[float] = None
+        self.pre_etar: Optional[float] = None
+        self.pre_etau: Optional[float] = None
+
+        self._adjust = _RowTable()
+        # rows: time, values (padded or trimmed to _FULL_COLS)
+        self._output = {
+            name: _GrowableArray(width=1 + len(_FULL_COLS)) for name in _OUTPUT_DATA
+        }
+        # rows: the number of bins, bins (padded with zeros)
+        self._steps = {
+            "I": _GrowableArray(np.int64, 0),
+            "R": _GrowableArray(np.int64, 0),
+        }
+        # rows keyed by the time of ADJUST block (the last one wins)
+        self._ks = _RowTable()
+        self._profile = _RowTable()
+        self._eta = _RowTable()
+        self._hdf5 = _RowTable(np.int64, 0)  # keyed by TTOT
+
+        self._current_time_idx: Optional[float] = None
+        self._output_rows = {name: [] for name in _OUTPUT_DATA}  # not yet in _output
+        self._window: List[str] = []  # read, but not parsed lines
+        self._header_done = False
+        self._stopped = False  # log is broken, the rest is ignored
+        self._final = False  # the end of the log was parsed by update(final=True)
+        # ETAI/ETAR/ETAU are known, they are not when a chunk of a log is parsed
+        # (see _parse_chunk), then ADJUST times -> whether values were carried over
+        self._eta_known = True
+        self._eta_inherited: Optional[Dict[float, bool]] = None
+
+    def update(self, final: bool = False, end: Optional[int] = None) -> bool:
+        """Parse lines appended since the previous update.
+
+        Parameters
+        ----------
+        final :
+            Whether the log is complete: the last line without newline and
+            an incomplete ADJUST block at the end are parsed too.
+            Default: False.
+        end : Optional[int]
+            Byte offset to stop reading at, it should be the start of a line.
+            Default: None (the end of the file).
+        Returns
+        -------
+        bool
+            Whether new lines were read.
+        """
+        new_lines = False
+        with self.logfile.open("rb") as fh:
+            fh.seek(self.offset)
+            rest = b""  # the last line of a block is incomplete
+            while True:
+                size = self._READ_SIZE
+                if end is not None:
+                    size = max(min(size, end - fh.tell()), 0)
+                block = fh.read(size)
+                if not block:
+                    break
+                block = rest + block
+                n_bytes = block.rfind(b"\n") + 1
+                rest = block[n_bytes:]
+                if n_bytes:
+                    self._feed(block[:n_bytes])
+                    self.offset += n_bytes
+                    new_lines = True
+            if final and rest:
+                self._feed(rest)
+                self.offset += len(rest)
+                new_lines = True
+
+        if final:
+            self._final = True
+            if not self._header_done:
+                self._parse_header(self._window)
+                self._header_done = True
+            self._parse_window(final=True)
+        return new_lines
+
+    def _feed(self, data: bytes):
+        text, lines = _decode_lines(data)
+        if self.scaling is None and "PHYSICAL SCALING:" in text:
+            self.scaling = _search_scaling(lines)
+        if self._stopped:
+            return
+
+        self._window.extend(lines)
+        if not self._header_done:
+            if len(self._window) < self._HEADER_LINES:
+                return
+            self._parse_header(self._window[: self._HEADER_LINES])
+            self._header_done = True
+        self._parse_window(final=False)
+
+    def _parse_window(self, final: bool, n_lines: Optional[int] = None):
+        """Parse the first `n_lines` lines of the window (all by default),
+        the rest is only the lookahead of ADJUST blocks. Keep the last ADJUST
+        block until all its lines are read (unless `final`)."""
+        lines = self._window
+        stop = len(lines) if n_lines is None else n_lines
+        for i in [i for i, line in enumerate(lines[:stop]) if _is_record(line)]:
+            raw = lines[i]
+            if "ADJUST:" not in raw and "STEP" not in raw:
+                self._parse_record(raw)  # the most common case
+                continue
+            if not final and stop - i < self._ADJUST_LINES and "ADJUST:" in raw:
+                stop = i  # wait for the rest of the block
+                break
+            self._parse_line(lines, i)
+            if self._stopped:
+                break
+        self._window = [] if self._stopped else lines[stop:]
+
+        for name, rows in self._output_rows.items():
+            self._output[name].extend(rows)
+            rows.clear()
+
+    def _parse_header(self, lines: List[str]):
+        for i, raw in enumerate(lines[:50]):
+            s = raw.strip()
+            if i + 2 >= len(lines):
+                break
+            if s.startswith("ETAI") and "ETAR" in s:
+                next_line = lines[i + 2]
+                parts = next_line.split()
+                self.pre_etai = _safe_float(parts[0])
+                self.pre_etar = _safe_float(parts[1])
+            elif s.startswith("DTMIN") and "RMIN" in s and "ETAU" in s:
+                next_line = lines[i + 2]
+                parts = next_line.split()
+                self.pre_etau = _safe_float(parts[2])
+
+    def _parse_line(self, lines: List[str], i: int):
+        """Parse the i-th line of `lines`, the following lines are the
+        lookahead of an ADJUST block."""
+        raw = lines[i]
+
+        # STEP lines ('*****' makes int() fail, as does ' nan')
+        stripped = raw.strip()
+        if stripped.startswith(("STEP I", "STEP R")):
             parts = stripped.split()
-            if len(parts) >= 2:
-                step_type = parts[1]
-                try:
-                    values = [int(x) for x in parts[2:]]
-                except ValueError:
-                    continue
-                if step_type in step_lists:
-                    step_lists[step_type].append(values)
-            continue
+            step_type = parts[1]
+            try:
+                values = [int(x) for x in parts[2:]]
+            except ValueError:
+                return
+            if step_type in self._steps:
+                self._steps[step_type].append([len(values), *values])
+            return
 
         # ADJUST lines
-        if "ADJUST:" in line:
-            toks = re.sub(r"\s+", " ", line).strip().split(" ")
+        if "ADJUST:" in raw:
+            toks = raw.replace("*****", " nan").split()
             if len(toks) >= 3:
                 time_token = toks[2]
                 try:
@@ -185,16 +510,13 @@ def parse_log(
                     try:
                         time_val = float(time_token.replace("D", "E"))
                     except Exception:
-                        continue
-                current_time_idx = time_val
-                cols = toks[3::2]
-                vals_toks = toks[4::2]
-                vals = [_safe_float(vt) for vt in vals_toks]
+                        return
+                self._current_time_idx = time_val
                 row: Dict = {"time": time_val}
-                for c, v in zip(cols, vals):
-                    row[c] = v
-                adjust_rows.append(row)
+                row.update(zip(toks[3::2], _safe_floats(toks[4::2])))
+                self._adjust.append(row)
 
+            current_time_idx = self._current_time_idx
             try:
                 # RMIN / DTMIN lines
                 ks_line = lines[i + 2]
@@ -202,7 +524,7 @@ def parse_log(
                 if matches:
                     params = {k: float(v) for k, v in matches if k in ("DTMIN", "RMIN")}
                     if params:
-                        ks_params[current_time_idx] = params
+                        self._ks.put(current_time_idx, params)
 
                 # profile lines
                 profile_header = lines[i + 3].strip().split()
@@ -214,10 +536,11 @@ def parse_log(
                         for k, v in zip(profile_header, profile_vals)
                         if k in ("N", "Reg.", "Irr.", "KS")
                     }
-                    profile_params[current_time_idx] = params
+                    self._profile.put(current_time_idx, params)
             except:
                 warnings.warn("Log incomplete! Seems like simulation stopped abruptly")
-                break
+                self._stopped = True
+                return
 
             # Explicit ETAI = ... lines override
             try:
@@ -227,155 +550,459 @@ def parse_log(
                     params = {
                         k: float(v) for k, v in matches if k in ("ETAI", "ETAU", "ETAR")
                     }
-                    pre_etai = params["ETAI"]
-                    pre_etar = params["ETAR"]
-                    pre_etau = params["ETAU"]
+                    self.pre_etai = params["ETAI"]
+                    self.pre_etar = params["ETAR"]
+                    self.pre_etau = params["ETAU"]
+                    self._eta_known = True
                 else:
                     params = {}
-                    params["ETAI"] = pre_etai
-                    params["ETAR"] = pre_etar
-                    params["ETAU"] = pre_etau
+                    params["ETAI"] = self.pre_etai
+                    params["ETAR"] = self.pre_etar
+                    params["ETAU"] = self.pre_etau
 
-                eta_params[current_time_idx] = params
+                self._eta.put(current_time_idx, params)
+                if self._eta_inherited is not None:
+                    self._eta_inherited[current_time_idx] = not self._eta_known
             except:
                 warnings.warn("Log incomplete! Seems like simulation stopped abruptly")
-                break
+                self._stopped = True
+            return
 
-            continue
+        self._parse_record(raw)
 
-        # Output-type lines (RLAGR, AVMASS, ...)
-        for data_type in _OUTPUT_DATA:
-            if data_type in line:
-                toks = re.sub(r"\s+", " ", raw).strip().split(" ")
-                if len(toks) < 3:
-                    break
-                time_token = toks[0].replace("D", "E")
+    def _parse_record(self, raw: str):
+        """Parse a line which is neither STEP nor ADJUST line."""
+        # Output-type lines (RLAGR, AVMASS, ...): time, name, values
+        match = _OUTPUT_RE.search(raw)
+        if match:
+            toks = raw.split()
+            if len(toks) >= 3:
                 try:
-                    time_val = float(time_token)
+                    time_val = float(toks[0].replace("D", "E"))
+                except ValueError:
+                    time_val = None
+                if time_val is not None:
+                    row = [time_val, *_safe_floats(toks[2 : 2 + len(_FULL_COLS)])]
+                    row += [np.nan] * (1 + len(_FULL_COLS) - len(row))
+                    self._output_rows[match.group()].append(row)
+
+        if "TTOT" in raw:  # if hdf5 is present
+            match = _HDF5_RE.search(raw)
+            if match:
+                try:
+                    ttot = float(match.group(1))
                 except ValueError:
+                    return
+                self._hdf5.put(
+                    ttot,
+                    {
+                        "N_STAR": int(match.group(2)),
+                        "N_BINARY": int(match.group(3)),
+                        "N_MERGER": int(match.group(4)),
+                    },
+                )
+
+    def _tables(self) -> Dict[str, _RowTable]:
+        return {
+            "adjust": self._adjust,
+            "ks": self._ks,
+            "profile": self._profile,
+            "eta": self._eta,
+            "hdf5_output": self._hdf5,
+        }
+
+    def _merge(self, chunk: "LogParser"):
+        """Add rows of the next chunk of the log (see `_parse_chunk`) as if
+        its lines were parsed by this parser."""
+        if self.scaling is None:
+            self.scaling = chunk.scaling
+        if self._stopped:
+            return
+
+        # ADJUST blocks before the first ETAI line of the chunk carry values over
+        eta = {"ETAI": self.pre_etai, "ETAR": self.pre_etar, "ETAU": self.pre_etau}
+        for key, inherited in chunk._eta_inherited.items():
+            if inherited:
+                chunk._eta.put(key, eta)
+        if chunk._eta_known:
+            self.pre_etai = chunk.pre_etai
+            self.pre_etar = chunk.pre_etar
+            self.pre_etau = chunk.pre_etau
+
+        chunk_tables = chunk._tables()
+        for name, table in self._tables().items():
+            table.merge(chunk_tables[name])
+        for name, rows in self._output.items():
+            rows.extend(chunk._output[name].values)
+        for name, rows in self._steps.items():
+            rows.extend(chunk._steps[name].values)
+
+        self.offset = chunk.offset
+        self._current_time_idx = chunk._current_time_idx
+        self._stopped = chunk._stopped
+
+    def _digest(self) -> str:
+        """Digest of the last bytes before `offset`, it tells whether the
+        parsed part of the log is still the same."""
+        start = max(self.offset - _LOG_CACHE_CHECK_BYTES, 0)
+        with self.logfile.open("rb") as fh:
+            fh.seek(start)
+            return hashlib.sha1(fh.read(self.offset - start)).hexdigest()
+
+    def save(self, cache_file: Union[str, Path]):
+        """Store the parser state into an npz file, one array per table
+        plus json metadata (offset, size and mtime of the log, carried
+        over ETAI/ETAR/ETAU, unparsed lines).
+
+        The state can be saved only before `update(final=True)`, which
+        parses an incomplete end of the log for good. A failed write
+        issues a warning only.
+
+        Parameters
+        ----------
+        cache_file : Union[str, Path]
+            Output file, see `log_cache_path`.
+        """
+        if self._final:
+            raise RuntimeError("State of a log parsed with final=True can't be saved")
+
+        cache_file = Path(cache_file)
+        stat = os.stat(self.logfile)
+        meta = {
+            "version": _LOG_CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "offset": self.offset,
+            "digest": self._digest(),
+            "scaling": self.scaling,
+            "eta": [self.pre_etai, self.pre_etar, self.pre_etau],
+            "current_time_idx": self._current_time_idx,
+            "header_done": self._header_done,
+            "stopped": self._stopped,
+        }
+        arrays = {
+            "meta": np.array(json.dumps(meta)),
+            "window": np.array(self._window, dtype=str),
+        }
+        for name, table in self._tables().items():
+            arrays[f"{name}.values"] = table._array.values
+            arrays[f"{name}.columns"] = np.array(list(table.columns), dtype=str)
+            arrays[f"{name}.keys"] = np.array(list(table.keys), dtype=np.float64)
+        for name, rows in self._output.items():
+            arrays[f"output.{name}"] = rows.values
+        for name, rows in self._steps.items():
+            arrays[f"step.{name}"] = rows.values
+
+        tmp = cache_file.with_name(f"{cache_file.name}.tmp")
+        try:
+            with open(tmp, "wb") as fh:
+                np.savez(fh, **arrays)
+            os.replace(tmp, cache_file)
+        except OSError as e:
+            warnings.warn(f"Could not store parsed log {cache_file}: {e}")
+
+    @classmethod
+    def load(
+        cls, logfile: Union[str, Path], cache_file: Union[str, Path]
+    ) -> Optional["LogParser"]:
+        """Restore a parser stored with `save`.
+
+        The cache is valid if size and mtime of the log did not change, or
+        if the log grew and the bytes before the parsed offset are the
+        same (lines were appended only). The next `update` parses the
+        appended lines.
+
+        Parameters
+        ----------
+        logfile : Union[str, Path]
+            Log file.
+        cache_file : Union[str, Path]
+            File written by `save`.
+        Returns
+        -------
+        Optional[LogParser]
+            None if the cache is missing, broken or does not match the log.
+        """
+        parser = cls(logfile)
+        try:
+            with np.load(cache_file) as data:
+                meta = json.loads(data["meta"].item())
+                if meta["version"] != _LOG_CACHE_VERSION:
+                    return None
+
+                parser.offset = meta["offset"]
+                stat = os.stat(logfile)
+                if (stat.st_size, stat.st_mtime_ns) != (meta["size"], meta["mtime_ns"]):
+                    if (
+                        stat.st_size < parser.offset
+                        or parser._digest() != meta["digest"]
+                    ):
+                        return None
+
+                parser.scaling = meta["scaling"]
+                parser.pre_etai, parser.pre_etar, parser.pre_etau = meta["eta"]
+                parser._current_time_idx = meta["current_time_idx"]
+                parser._header_done = meta["header_done"]
+                parser._stopped = meta["stopped"]
+                parser._window = data["window"].tolist()
+                for name, table in parser._tables().items():
+                    columns = data[f"{name}.columns"].tolist()
+                    keys = data[f"{name}.keys"].tolist()
+                    table.columns = dict(zip(columns, range(len(columns))))
+                    table.keys = dict(zip(keys, range(len(keys))))
+                    table._array.extend(data[f"{name}.values"])
+                for name, rows in parser._output.items():
+                    rows.extend(data[f"output.{name}"])
+                for name, rows in parser._steps.items():
+                    rows.extend(data[f"step.{name}"])
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+
+        if parser._stopped:
+            warnings.warn("Log incomplete! Seems like simulation stopped abruptly")
+        return parser
+
+    def result(
+        self,
+    ) -> Dict[str, Union[pd.DataFrame, Dict[str, pd.DataFrame], None]]:
+        """Build DataFrames from the lines parsed so far (see `parse_log`).
+
+        DataFrames are built anew on every call, so they may be modified.
+        """
+        # --- Build DataFrames (keep last ADJUST row when times duplicate) ---
+        # in case of terminated runs and concatenated logs
+        if len(self._adjust):
+            df_adjust = self._adjust.frame().set_index("time").sort_index()
+        else:
+            df_adjust = pd.DataFrame()
+
+        # create ks/profile/eta dataframes from collected dicts
+        df_ks = self._ks.frame()
+        df_profile = self._profile.frame()
+        df_eta = self._eta.frame()
+        df_hdf5 = self._hdf5.frame()
+
+        # values stay None until the first ETAI line, a column of them is kept
+        # as None (object dtype) instead of NaN
+        eta = {"ETAI": self.pre_etai, "ETAR": self.pre_etar, "ETAU": self.pre_etau}
+        for name, value in eta.items():
+            if value is None and name in df_eta:
+                df_eta[name] = pd.Series(None, index=df_eta.index, dtype=object)
+
+        # Deduplicate the DataFrames by index, keeping the LAST occurrence
+        def deduplicate(df):
+            if not df.empty and not df.index.is_unique:
+                df = df.groupby(level=0).last()
+            return df
+
+        df_adjust = deduplicate(df_adjust)
+        df_ks = deduplicate(df_ks)
+        df_profile = deduplicate(df_profile)
+        df_eta = deduplicate(df_eta)
+        df_hdf5 = deduplicate(df_hdf5)
+
+        # Now safe to concat
+        df_adjust = pd.concat([df_adjust, df_profile, df_ks, df_eta], axis=1)
+
+        output_result: Dict[str, pd.DataFrame] = {}
+        for data_type, rows in self._output.items():
+            if not rows.n_rows:
+                output_result[data_type] = pd.DataFrame(columns=_FULL_COLS)
+                continue
+            df = pd.DataFrame(
+                rows.values[:, 1:],
+                index=pd.Index(rows.values[:, 0], name="time"),
+                columns=_FULL_COLS,
+                copy=True,
+            )
+            df.sort_index(inplace=True)
+            output_result[data_type] = df
+
+        # Build step dataframes only if there is STEP content
+        any_step_found = any(rows.n_rows > 0 for rows in self._steps.values())
+        if any_step_found:
+            step_dfs: Dict[str, pd.DataFrame] = {}
+            for key, rows in self._steps.items():
+                if not rows.n_rows:
+                    continue
+                lengths = rows.values[:, 0]
+                cols = [f"bin_{i}" for i in range(rows.n_cols - 1)]
+                df = pd.DataFrame(rows.values[:, 1:], columns=cols, copy=True)
+                for i in range(lengths.min(), len(cols)):  # padded with NaN
+                    df[cols[i]] = np.where(lengths > i, df[cols[i]], np.nan)
+                step_dfs[key] = df
+        else:
+            step_dfs = None  # explicitly indicate absence
+
+        return {
+            "adjust": df_adjust,
+            "output": output_result,
+            "hdf5_output": df_hdf5,
+            "step": step_dfs,
+            "scaling": self.scaling,
+        }
+
+
+def _chunk_bounds(logfile: Union[str, Path], n_chunks: int) -> List[int]:
+    """Byte offsets which split a log into at most `n_chunks` parts.
+
+    The first part holds the header, every other part starts with an
+    ADJUST line with a valid time, so ADJUST blocks are never split and
+    every part knows the time of its blocks.
+    """
+    size = os.path.getsize(logfile)
+    bounds = [0]
+    with open(logfile, "rb") as fh:
+        for _ in range(LogParser._HEADER_LINES):
+            fh.readline()
+        header_end = fh.tell()
+
+        for k in range(1, n_chunks):
+            fh.seek(max(k * size // n_chunks, header_end, bounds[-1]))
+            fh.readline()  # skip a partial line
+            while True:
+                start = fh.tell()
+                line = fh.readline()
+                if not line:
+                    return bounds + [size]
+                if b"ADJUST:" in line and not line.strip().startswith(b"STEP"):
+                    toks = (
+                        line.decode(errors="replace").replace("*****", " nan").split()
+                    )
+                    if len(toks) >= 3 and not np.isnan(_safe_float(toks[2])):
+                        bounds.append(start)
+                        break
+    return bounds + [size]
+
+
+def _parse_chunk(logfile: Union[str, Path], bounds: Tuple[int, int]) -> LogParser:
+    """Parse bytes start:end of a log (see `_chunk_bounds`).
+
+    Lines after `end` are read only as the lookahead of the last ADJUST
+    block. ETAI/ETAR/ETAU of previous chunks are unknown here, ADJUST
+    blocks which carry them over are filled in by `LogParser._merge`.
+    """
+    start, end = bounds
+    parser = LogParser(logfile)
+    parser.offset = start
+    if start > 0:
+        parser._header_done = True
+        parser._eta_known = False
+        parser._eta_inherited = {}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # the merged log warns once
+        if end == os.path.getsize(logfile):
+            parser.update(final=True)
+            return parser
+
+        parser.update(end=end)
+        with open(logfile, "rb") as fh:
+            fh.seek(end)
+            data = b""
+            while data.count(b"\n") < LogParser._ADJUST_LINES:
+                block = fh.read(64 * 1024)
+                if not block:
                     break
-                val_tokens = toks[2:]
-                values = [_safe_float(vt) for vt in val_tokens]
-                output_rows[data_type].append((time_val, values))
-                break
+                data += block
+        n_lines = len(parser._window)
+        parser._window += _decode_lines(data)[1][: LogParser._ADJUST_LINES - 1]
+        parser._parse_window(final=True, n_lines=n_lines)
+    return parser
 
-        try:  # if hdf5 is present
-            pattern = (
-                r"TTOT\s+([0-9.eE+-]+)\s+"
-                r"N_STAR\s+(\d+)\s+"
-                r"N_BINARY\s+(\d+)\s+"
-                r"N_MERGER\s+(\d+)\s+"
-                r"Output reduced 0/1=\s+(\d+)"
-            )
 
-            match = re.search(pattern, raw)
+def parse_log(
+    logfile: Union[str, Path],
+    jobs: int = 1,
+) -> Dict[str, Union[pd.DataFrame, Dict[str, pd.DataFrame], None]]:
+    """Parse an Nbody6++GPU log file in one pass.
+
+    With `jobs` other than 1, a large log is split into chunks at ADJUST
+    lines which are parsed in worker processes (see
+    `utils.parallel.parallel_map`), the result is the same.
 
-            if match:
-                ttot = float(match.group(1))
-                n_star = int(match.group(2))
-                n_binary = int(match.group(3))
-                n_merger = int(match.group(4))
-
-                # print(ttot, n_star, n_binary, n_merger, reduced)
-                hdf5_params[ttot] = {
-                    "N_STAR": n_star,
-                    "N_BINARY": n_binary,
-                    "N_MERGER": n_merger,
-                }
-        except:
-            pass
-
-    # --- Build DataFrames (keep last ADJUST row when times duplicate) ---
-    # in case of terminated runs and concatenated logs
-    if adjust_rows:
-        df_adjust = pd.DataFrame(adjust_rows).set_index("time").sort_index()
-    else:
-        df_adjust = pd.DataFrame()
-
-    # create ks/profile/eta dataframes from collected dicts
-    df_ks = pd.DataFrame.from_dict(ks_params, orient="index")
-    df_profile = pd.DataFrame.from_dict(profile_params, orient="index")
-    df_eta = pd.DataFrame.from_dict(eta_params, orient="index")
-    df_hdf5 = pd.DataFrame.from_dict(hdf5_params, orient="index")
-
-    # Deduplicate the DataFrames by index, keeping the LAST occurrence
-    def deduplicate(df):
-        if not df.empty and not df.index.is_unique:
-            df = df.groupby(level=0).last()
-        return df
-
-    df_adjust = deduplicate(df_adjust)
-    df_ks = deduplicate(df_ks)
-    df_profile = deduplicate(df_profile)
-    df_eta = deduplicate(df_eta)
-    df_hdf5 = deduplicate(df_hdf5)
-
-    # Now safe to concat
-    df_adjust = pd.concat([df_adjust, df_profile, df_ks, df_eta], axis=1)
-
-    output_result: Dict[str, pd.DataFrame] = {}
-    for data_type, rows in output_rows.items():
-        if not rows:
-            output_result[data_type] = pd.DataFrame(columns=_FULL_COLS)
-            continue
-        times, vals_list = zip(*rows)
-        df = pd.DataFrame(vals_list, index=pd.Index(times, name="time"))
-        expected_n = len(_FULL_COLS)
-        if df.shape[1] < expected_n:
-            for i in range(df.shape[1], expected_n):
-                df[i] = np.nan
-        elif df.shape[1] > expected_n:
-            df = df.iloc[:, :expected_n]
-        df.columns = _FULL_COLS
-        df.sort_index(inplace=True)
-        output_result[data_type] = df
-
-    # Build step dataframes only if there is STEP content
-    any_step_found = any(len(lst) > 0 for lst in step_lists.values())
-    if any_step_found:
-        step_dfs: Dict[str, pd.DataFrame] = {}
-        for key, rows in step_lists.items():
-            if not rows:
-                continue
-            maxlen = max(len(r) for r in rows)
-            cols = [f"bin_{i}" for i in range(maxlen)]
-            normalized = [r + [np.nan] * (maxlen - len(r)) for r in rows]
-            step_dfs[key] = pd.DataFrame(normalized, columns=cols)
-    else:
-        step_dfs = None  # explicitly indicate absence
+    Returns dict with keys:
+      - "adjust": DataFrame (index=time)
+      - "output": dict mapping data_type -> DataFrame (columns=_FULL_COLS)
+      - "step": dict mapping 'I'/'R' -> DataFrame, or None if not present
+      - "scaling": dict with keys 'R*','M*','V*','T*' or None
+    """
+    n_workers = jobs if jobs > 0 else os.cpu_count()
+    n_chunks = min(n_workers, os.path.getsize(logfile) // _MIN_CHUNK_SIZE)
+    if n_chunks <= 1:
+        parser = LogParser(logfile)
+        parser.update(final=True)
+        return parser.result()
+
+    bounds = _chunk_bounds(logfile, n_chunks)
+    tasks = parallel_map(
+        partial(_parse_chunk, logfile), list(zip(bounds[:-1], bounds[1:])), jobs=jobs
+    )
+    for task in tasks:
+        if task.error is not None:
+            raise task.error
 
-    return {
-        "adjust": df_adjust,
-        "output": output_result,
-        "hdf5_output": df_hdf5,
-        "step": step_dfs,
-        "scaling": scaling,
-    }
+    parser = tasks[0].value
+    for task in tasks[1:]:
+        parser._merge(task.value)
+    if parser._stopped:
+        warnings.warn("Log incomplete! Seems like simulation stopped abruptly")
+    return parser.result()
 
 
 def load_scaling(logfile: str):
     """Get scale coefficient from log file."""
-    pat = re.compile(
-        r"""PHYSICAL\ SCALING:      # literal header
-            \s*R\*\s*=\s*([0-9E+.\-]+)   # capture R*
-            \s*M\*\s*=\s*([0-9E+.\-]+)   # capture M*
-            \s*V\*\s*=\s*([0-9E+.\-]+)   # capture V*
-            \s*T\*\s*=\s*([0-9E+.\-]+)   # capture T*
-        """,
-        re.VERBOSE,
-    )
-
     with open(logfile) as nb_stdout:
-        for line in nb_stdout:
-            m = re.search(pat, line)
-            if m:
-                keys = ["R*", "M*", "V*", "T*"]
-                vals = map(float, m.groups())
-                return dict(zip(keys, vals))
+        return _search_scaling(nb_stdout)
+
+
+def log_cache_path(logfile: Union[str, Path]) -> Path:
+    """Default cache of a parsed log: 'exp.out' -> 'exp.out.parsed.npz'."""
+    logfile = Path(logfile)
+    return logfile.with_name(f"{logfile.name}.parsed.npz")
 
 
-def load_data(logfile: Union[str, Path]):
-    return parse_log(logfile)
+def cached_parser(
+    logfile: Union[str, Path],
+    cache_file: Optional[Union[str, Path]] = None,
+) -> LogParser:
+    """Restore the parser of a log from its cache and parse lines appended
+    since then, the cache is rewritten if there were new lines. A cache
+    which does not match the log is replaced.
+
+    Parameters
+    ----------
+    logfile : Union[str, Path]
+        Log file.
+    cache_file : Optional[Union[str, Path]]
+        Cache of the parsed log. Default: see `log_cache_path`.
+    Returns
+    -------
+    LogParser
+        Parser which is not finalized yet, call `update(final=True)` before `result`.
+    """
+    if cache_file is None:
+        cache_file = log_cache_path(logfile)
+    parser = LogParser.load(logfile, cache_file)
+    if parser is None:
+        parser = LogParser(logfile)
+    if parser.update():
+        parser.save(cache_file)
+    return parser
+
+
+def load_data(logfile: Union[str, Path], cache: bool = True, jobs: int = 1):
+    """Parse a log file, see `parse_log`.
+
+    With `cache`, the parsed log is kept next to it (see `cached_parser`),
+    so loading it again reads only lines appended since the last time.
+    Otherwise it is parsed with `jobs` worker processes.
+    """
+    if not cache:
+        return parse_log(logfile, jobs=jobs)
+    parser = cached_parser(logfile)
+    parser.update(final=True)
+    return parser.result()
 
 
 # ——— Data plotting ———
@@ -407,10 +1034,16 @@ def plot_adjust_data(
     return ax.figure, ax
 
 
-def plot_output_data(data: dict, plot_values: list, astro_units: bool):
+def plot_output_data(
+    data: dict,
+    plot_values: list,
+    astro_units: bool,
+    fig: Optional[matplotlib.figure.Figure] = None,
+):
     """Plot data produced at 'output' stage.
 
-    Both N-body units and astro units are supported.
+    Both N-body units and astro units are supported. If `fig` is given,
+    it is cleared and reused.
     """
     if astro_units:
         data["RLAGR"] *= data["R*"]
@@ -424,7 +1057,11 @@ def plot_output_data(data: dict, plot_values: list, astro_units: bool):
     n_cols = np.ceil(np.sqrt(N)).astype(np.int32)
     n_rows = np.ceil(N / n_cols).astype(np.int32)
 
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(12, 4 * n_rows))
+    if fig is None:
+        fig, axes = plt.subplots(n_rows, n_cols, figsize=(12, 4 * n_rows))
+    else:
+        fig.clf()
+        axes = fig.subplots(n_rows, n_cols)
     axes = np.atleast_1d(axes).flatten()
 
     for ax, pdata in zip(axes, plot_values):
@@ -452,7 +1089,7 @@ def plot_output_data(data: dict, plot_values: list, astro_units: bool):
         ax.set_visible(False)
 
     fig.tight_layout()
-    plt.legend()
+    fig.gca().legend()
     return fig, ax
 
 
@@ -0,0 +1,27 @@
+from .index import FrameIndex
+from .index import index_path
+from .index import load_index
+from .store import SnapStore
+from .store import convert_to_store
+from .store import is_store
+from .store import store_path
+from .store import write_store
+from .structure import NemoFormatError
+from .structure import read_snapshot_at
+from .structure import read_snapshots_at
+from .structure import scan_snapshots
+
+__all__ = [
+    "FrameIndex",
+    "NemoFormatError",
+    "SnapStore",
+    "convert_to_store",
+    "index_path",
+    "is_store",
+    "load_index",
+    "read_snapshot_at",
+    "read_snapshots_at",
+    "scan_snapshots",
+    "store_path",
+    "write_store",
+]
@@ -0,0 +1,70 @@
+"""Persistent frame index stored next to a NEMO snapshot file."""
+
+import os
+import tempfile
+import warnings
+from pathlib import Path
+from typing import NamedTuple
+from typing import Union
+
+import numpy as np
+
+from .structure import scan_snapshots
+
+_INDEX_VERSION = 1
+
+
+class FrameIndex(NamedTuple):
+    """Times, byte offsets and particle numbers of all frames in a
+    file."""
+
+    times: np.ndarray
+    offsets: np.ndarray
+    nobj: np.ndarray
+
+
+def index_path(filename: Union[str, Path]) -> Path:
+    """Sidecar file for a given snapshot: 'out_scaled.nemo' ->
+    'out_scaled.nemo.index.npz'."""
+    filename = Path(filename)
+    return filename.with_name(f"{filename.name}.index.npz")
+
+
+def _file_signature(filename: Union[str, Path]) -> np.ndarray:
+    stat = os.stat(filename)
+    return np.array([_INDEX_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def load_index(
+    filename: Union[str, Path],
+    rebuild: bool = False,
+) -> FrameIndex:
+    """Load frame index for a NEMO snapshot.
+
+    The index is rebuilt (one header-only pass over the file) if the
+    sidecar is missing or the snapshot size/mtime changed.
+    """
+    signature = _file_signature(filename)
+    sidecar = index_path(filename)
+
+    if not rebuild and sidecar.exists():
+        try:
+            with np.load(sidecar) as data:
+                if np.array_equal(data["signature"], signature):
+                    return FrameIndex(data["times"], data["offsets"], data["nobj"])
+        except (OSError, KeyError, ValueError):
+            pass  # corrupted index, rebuild
+
+    index = FrameIndex(*scan_snapshots(filename))
+
+    # a unique temporary file, processes may build the same index at once
+    try:
+        with tempfile.NamedTemporaryFile(
+            dir=sidecar.parent, prefix=f"{sidecar.name}.", suffix=".tmp", delete=False
+        ) as fh:
+            np.savez(fh, signature=signature, **index._asdict())
+        os.replace(fh.name, sidecar)
+    except OSError as e:
+        warnings.warn(f"Could not store frame index {sidecar}: {e}")
+
+    return index
@@ -0,0 +1,266 @@
+"""Columnar snapshot store: a time series (NEMO snapshot or Nbody6++GPU
+HDF5 run) converted into a directory of per-field arrays which are
+opened with memory mapping.
+
+Layout of a store::
+
+    out_scaled.store/
+        meta.json   # format version, source file signature, fields
+        times.npy   # [F] frame times
+        bounds.npy  # [F + 1] frame i occupies rows bounds[i]:bounds[i + 1]
+        mass.npy    # [sum(N)] masses
+        pos.npy     # [sum(N), 3] positions
+        vel.npy     # [sum(N), 3] velocities
+        key.npy     # [sum(N)] particle keys (only if the source has them)
+
+Particles of a frame are contiguous in every field, so reading one
+field of one frame is a zero-copy slice of a memory map.
+"""
+
+import json
+import os
+import shutil
+import warnings
+from pathlib import Path
+from typing import Iterable
+from typing import Optional
+from typing import Union
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from .index import load_index
+from .structure import _FRAME_PATHS
+from .structure import _KEY_PATH
+from .structure import NemoFormatError
+from .structure import _items_to_frame
+from .structure import read_items_at
+
+_STORE_VERSION = 1
+_META_NAME = "meta.json"
+
+
+def store_path(filename: Union[str, Path]) -> Path:
+    """Default store for a given snapshot: 'out_scaled.nemo' ->
+    'out_scaled.store'."""
+    return Path(filename).with_suffix(".store")
+
+
+def is_store(path: Union[str, Path]) -> bool:
+    """Whether `path` is a snapshot store directory."""
+    return (Path(path) / _META_NAME).is_file()
+
+
+def _source_signature(filename: Union[str, Path]) -> dict:
+    stat = os.stat(filename)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def convert_to_store(
+    filename: Union[str, Path],
+    store_dir: Optional[Union[str, Path]] = None,
+    overwrite: bool = False,
+) -> Path:
+    """Convert all frames of a NEMO snapshot into a columnar store.
+
+    Frames are streamed one by one into preallocated memory-mapped
+    arrays, so the conversion needs memory for a single frame only. The
+    store is written into a temporary directory and moved into place at
+    the end.
+
+    Parameters
+    ----------
+    filename : Union[str, Path]
+        the name of NEMO snapshot file
+    store_dir : Optional[Union[str, Path]]
+        Output directory. Default: see `store_path`.
+    overwrite :
+        Whether to replace an existing store. Default: False.
+    Returns
+    -------
+    Path
+        Store directory.
+    """
+    filename = Path(filename)
+    store_dir = store_path(filename) if store_dir is None else Path(store_dir)
+    if store_dir.exists() and not overwrite:
+        raise RuntimeError(f"{store_dir} already exists")
+
+    index = load_index(filename)
+    if np.any(index.nobj < 0):
+        raise NemoFormatError(f"frames of {filename} have no 'Nobj' item")
+
+    def frames():
+        paths = _FRAME_PATHS | {_KEY_PATH}
+        for items in read_items_at(filename, index.offsets, paths):
+            frame = _items_to_frame(items)
+            yield {
+                "mass": frame[:, 0],
+                "pos": frame[:, 1:4],
+                "vel": frame[:, 4:7],
+                "key": items.get(_KEY_PATH),
+            }
+
+    return write_store(store_dir, filename, index.times, index.nobj, frames())
+
+
+def write_store(
+    store_dir: Union[str, Path],
+    source: Union[str, Path],
+    times: np.ndarray,
+    nobj: np.ndarray,
+    frames: Iterable[dict[str, Optional[np.ndarray]]],
+) -> Path:
+    """Write frames into a columnar store replacing an existing one.
+
+    Frames are streamed one by one into preallocated memory-mapped
+    arrays. The store is written into a temporary directory and moved
+    into place at the end.
+
+    Parameters
+    ----------
+    store_dir : Union[str, Path]
+        Output directory.
+    source : Union[str, Path]
+        File or directory the frames come from (its signature is stored to detect changes).
+    times : np.ndarray
+        [F] times of frames.
+    nobj : np.ndarray
+        [F] the number of particles in every frame.
+    frames : Iterable[dict[str, Optional[np.ndarray]]]
+        Dicts with 'mass' [N], 'pos' [N, 3], 'vel' [N, 3] and optional 'key' [N] (may be None).
+    Returns
+    -------
+    Path
+        Store directory.
+    """
+    store_dir, source = Path(store_dir), Path(source)
+
+    bounds = np.zeros(len(nobj) + 1, dtype=np.int64)
+    np.cumsum(nobj, out=bounds[1:])
+    n_rows = int(bounds[-1])
+
+    tmp_dir = store_dir.with_name(f"{store_dir.name}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    np.save(tmp_dir / "times.npy", np.asarray(times, dtype=np.float64))
+    np.save(tmp_dir / "bounds.npy", bounds)
+    columns = {
+        "mass": open_memmap(
+            tmp_dir / "mass.npy", mode="w+", dtype=np.float64, shape=(n_rows,)
+        ),
+        "pos": open_memmap(
+            tmp_dir / "pos.npy", mode="w+", dtype=np.float64, shape=(n_rows, 3)
+        ),
+        "vel": open_memmap(
+            tmp_dir / "vel.npy", mode="w+", dtype=np.float64, shape=(n_rows, 3)
+        ),
+    }
+
+    n_frames = 0
+    for i, frame in enumerate(frames):
+        rows = slice(bounds[i], bounds[i + 1])
+        if frame["mass"].size != rows.stop - rows.start:
+            raise NemoFormatError(
+                f"frame t={times[i]} has {frame['mass'].size} particles, expected {nobj[i]}"
+            )
+
+        columns["mass"][rows] = frame["mass"]
+        columns["pos"][rows] = frame["pos"]
+        columns["vel"][rows] = frame["vel"]
+
+        if frame.get("key") is not None:
+            if "key" not in columns:  # frames without keys are filled with -1
+                columns["key"] = open_memmap(
+                    tmp_dir / "key.npy", mode="w+", dtype=np.int64, shape=(n_rows,)
+                )
+                columns["key"][:] = -1
+            columns["key"][rows] = frame["key"]
+        n_frames += 1
+
+    if n_frames != len(nobj):
+        raise NemoFormatError(f"got {n_frames} frames, expected {len(nobj)}")
+
+    for column in columns.values():
+        column.flush()
+
+    meta = {
+        "version": _STORE_VERSION,
+        "source": str(source.resolve()),
+        "source_signature": _source_signature(source),
+        "fields": list(columns),
+    }
+    with open(tmp_dir / _META_NAME, "w") as fh:
+        json.dump(meta, fh, indent=2)
+    del columns
+
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    os.replace(tmp_dir, store_dir)
+    return store_dir
+
+
+class SnapStore:
+    """Read-only access to a columnar snapshot store (see
+    `convert_to_store`).
+
+    Field arrays are memory mapped on first access, `get` returns
+    zero-copy views of a single frame.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        try:
+            with open(self.path / _META_NAME) as fh:
+                self.meta = json.load(fh)
+        except (OSError, ValueError) as e:
+            raise NemoFormatError(f"{path} is not a snapshot store ({e})")
+        if self.meta.get("version") != _STORE_VERSION:
+            raise NemoFormatError(
+                f"{path} has store version {self.meta.get('version')}, expected {_STORE_VERSION}"
+            )
+
+        source = self.meta["source"]
+        if (
+            os.path.exists(source)
+            and _source_signature(source) != self.meta["source_signature"]
+        ):
+            warnings.warn(f"{source} changed after {path} was created")
+
+        self.times = np.load(self.path / "times.npy")
+        self.bounds = np.load(self.path / "bounds.npy")
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return self.times.size
+
+    @property
+    def fields(self) -> list[str]:
+        return self.meta["fields"]
+
+    @property
+    def nobj(self) -> np.ndarray:
+        """The number of particles in every frame."""
+        return np.diff(self.bounds)
+
+    def column(self, field: str) -> np.ndarray:
+        """Memory-mapped field for all frames."""
+        if field not in self.fields:
+            raise RuntimeError(f"{self.path} has no field '{field}'")
+        if field not in self._columns:
+            self._columns[field] = np.load(self.path / f"{field}.npy", mmap_mode="r")
+        return self._columns[field]
+
+    def get(self, field: str, i: int) -> np.ndarray:
+        """Field of the i-th frame (read-only view, no copy)."""
+        return self.column(field)[self.bounds[i] : self.bounds[i + 1]]
+
+    def frame(self, i: int) -> np.ndarray:
+        """The i-th frame as [N, 7] array: m, x, y, z, vx, vy, vz."""
+        mass = self.get("mass", i)
+        frame = np.empty((mass.size, 7), dtype=np.float64)
+        frame[:, 0] = mass
+        frame[:, 1:4] = self.get("pos", i)
+        frame[:, 4:7] = self.get("vel", i)
+        return frame
@@ -0,0 +1,258 @@
+"""Minimal reader for NEMO binary structured files (see NEMO's
+filestruct(5)).
+
+Every item in a structured file is: magic number (short), type string,
+tag string (absent for the end-of-set marker), zero-terminated list of
+int dimensions (plural items only) and raw data. This allows to walk
+over a snapshot reading only headers and seeking over particle data.
+"""
+
+from pathlib import Path
+from typing import BinaryIO
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+import numpy as np
+
+_SING_MAGIC = 0x0992  # singular items
+_PLUR_MAGIC = 0x0B92  # plural items
+
+_SET_TYPE = "("
+_TES_TYPE = ")"
+
+_TYPE_MAP = {
+    "a": "u1",  # AnyType
+    "c": "S1",  # CharType
+    "b": "u1",  # ByteType
+    "s": "i2",  # ShortType
+    "i": "i4",  # IntType
+    "l": "i8",  # LongType
+    "h": "i2",  # HalfpType
+    "f": "f4",  # FloatType
+    "d": "f8",  # DoubleType
+}
+
+# snapshot items needed to build [N, 7] frames: m, x, y, z, vx, vy, vz
+_FRAME_PATHS = {
+    "Parameters/Nobj",
+    "Parameters/Time",
+    "Particles/Mass",
+    "Particles/PhaseSpace",
+    "Particles/Position",
+    "Particles/Velocity",
+}
+_HEADER_PATHS = {"Parameters/Nobj", "Parameters/Time"}
+_KEY_PATH = "Particles/Key"
+
+
+class NemoFormatError(RuntimeError):
+    """Raised when a file cannot be decoded as NEMO structured binary."""
+
+
+class _Item(NamedTuple):
+    type: str
+    tag: Optional[str]
+    dims: tuple[int, ...]
+
+
+def _read_cstring(fh: BinaryIO) -> str:
+    chars = bytearray()
+    while (c := fh.read(1)) != b"\0":
+        if not c:
+            raise NemoFormatError("unexpected end of file")
+        chars += c
+    return chars.decode("ascii")
+
+
+def _detect_endian(fh: BinaryIO) -> str:
+    pos = fh.tell()
+    raw = fh.read(2)
+    fh.seek(pos)
+    if len(raw) < 2:
+        raise NemoFormatError("file is too short")
+    for endian, order in (("<", "little"), (">", "big")):
+        if int.from_bytes(raw, order) in (_SING_MAGIC, _PLUR_MAGIC):
+            return endian
+    raise NemoFormatError(f"bad magic number {raw!r}, not a NEMO binary file")
+
+
+def _read_item_header(fh: BinaryIO, endian: str) -> Optional[_Item]:
+    """Read item header leaving `fh` at the beginning of item data.
+
+    Returns None at the end of file.
+    """
+    raw = fh.read(2)
+    if not raw:
+        return None
+    order = "little" if endian == "<" else "big"
+    magic = int.from_bytes(raw, order)
+    if magic not in (_SING_MAGIC, _PLUR_MAGIC):
+        raise NemoFormatError(f"bad magic number {raw!r} at byte {fh.tell() - 2}")
+
+    typ = _read_cstring(fh)
+    if typ == _TES_TYPE:
+        return _Item(typ, None, ())
+
+    tag = _read_cstring(fh)
+    dims = []
+    if magic == _PLUR_MAGIC:
+        while dim := int.from_bytes(fh.read(4), order, signed=True):
+            dims.append(dim)
+    return _Item(typ, tag, tuple(dims))
+
+
+def _item_dtype(item: _Item, endian: str) -> np.dtype:
+    try:
+        return np.dtype(_TYPE_MAP[item.type]).newbyteorder(endian)
+    except KeyError:
+        raise NemoFormatError(f"unsupported item type {item.type!r} ({item.tag})")
+
+
+def _read_data(fh: BinaryIO, item: _Item, endian: str) -> np.ndarray:
+    data = np.empty(item.dims or (1,), dtype=_item_dtype(item, endian))
+    if fh.readinto(memoryview(data).cast("B")) != data.nbytes:
+        raise NemoFormatError(f"unexpected end of file while reading {item.tag}")
+    return data if item.dims else data[0]
+
+
+def _skip_data(fh: BinaryIO, item: _Item, endian: str):
+    fh.seek(_item_dtype(item, endian).itemsize * int(np.prod(item.dims)), 1)
+
+
+def _read_set(
+    fh: BinaryIO,
+    endian: str,
+    load: Callable[[str], bool],
+    prefix: str = "",
+) -> dict[str, np.ndarray]:
+    """Read items up to the end of the current set.
+
+    Nested items are keyed by their path ('Particles/Mass'), data is
+    read only for paths accepted by `load`, otherwise it is skipped.
+    Every nested set is reported with a None value.
+    """
+    result = {}
+    while True:
+        item = _read_item_header(fh, endian)
+        if item is None:
+            raise NemoFormatError("unexpected end of file inside a set")
+        if item.type == _TES_TYPE:
+            return result
+
+        path = f"{prefix}{item.tag}"
+        if item.type == _SET_TYPE:
+            result[path] = None
+            result.update(_read_set(fh, endian, load, prefix=f"{path}/"))
+        elif load(path):
+            result[path] = _read_data(fh, item, endian)
+        else:
+            _skip_data(fh, item, endian)
+
+
+def iter_snapshot_sets(
+    fh: BinaryIO,
+    load: Callable[[str], bool],
+):
+    """Yield (byte offset, items) for every top-level 'SnapShot' set
+    containing particles."""
+    endian = _detect_endian(fh)
+    while True:
+        offset = fh.tell()
+        item = _read_item_header(fh, endian)
+        if item is None:
+            return
+        if item.type == _SET_TYPE:
+            items = _read_set(fh, endian, load)
+            if item.tag == "SnapShot" and "Particles" in items:
+                yield offset, items
+        elif item.type != _TES_TYPE:
+            _skip_data(fh, item, endian)  # History, Headline, etc.
+
+
+def scan_snapshots(
+    filename: Union[str, Path],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return times, byte offsets and particle numbers for all frames of a
+    NEMO snapshot without decoding particle data."""
+    times, offsets, nobj = [], [], []
+    with open(filename, "rb") as fh:
+        for offset, items in iter_snapshot_sets(fh, _HEADER_PATHS.__contains__):
+            times.append(items.get("Parameters/Time", 0.0))
+            offsets.append(offset)
+            nobj.append(items.get("Parameters/Nobj", -1))
+
+    return (
+        np.array(times, dtype=np.float64),
+        np.array(offsets, dtype=np.int64),
+        np.array(nobj, dtype=np.int64),
+    )
+
+
+def _items_to_frame(items: dict[str, np.ndarray]) -> np.ndarray:
+    """Convert snapshot items to [N, 7] array: m, x, y, z, vx, vy, vz."""
+    if "Particles/Mass" not in items:
+        raise NemoFormatError("snapshot has no 'Mass' item")
+    mass = items["Particles/Mass"]
+
+    frame = np.empty((mass.size, 7), dtype=np.float64)
+    frame[:, 0] = mass
+    if "Particles/PhaseSpace" in items:
+        frame[:, 1:7] = items["Particles/PhaseSpace"].reshape(-1, 6)
+    elif "Particles/Position" in items and "Particles/Velocity" in items:
+        frame[:, 1:4] = items["Particles/Position"]
+        frame[:, 4:7] = items["Particles/Velocity"]
+    else:
+        raise NemoFormatError(
+            "snapshot has neither 'PhaseSpace' nor 'Position'+'Velocity'"
+        )
+    return frame
+
+
+def read_items_at(
+    filename: Union[str, Path],
+    offsets: Iterable[int],
+    paths: set[str],
+):
+    """Yield items of 'SnapShot' sets starting at given byte offsets (see
+    `scan_snapshots`), reading data only for given `paths` (e.g.
+    'Particles/Mass').
+
+    The file is opened once, so ascending offsets are read in a single
+    forward pass.
+    """
+    with open(filename, "rb") as fh:
+        endian = _detect_endian(fh)
+        for offset in offsets:
+            fh.seek(offset)
+            item = _read_item_header(fh, endian)
+            if item is None or item.type != _SET_TYPE or item.tag != "SnapShot":
+                raise NemoFormatError(f"no 'SnapShot' set at byte {offset}")
+            yield _read_set(fh, endian, paths.__contains__)
+
+
+def read_snapshots_at(
+    filename: Union[str, Path],
+    offsets: Iterable[int],
+):
+    """Yield frames starting at given byte offsets (see `scan_snapshots`).
+
+    The file is opened once, so ascending offsets are read in a single
+    forward pass. Frames are [N, 7] arrays: m, x, y, z, vx, vy, vz.
+    """
+    for items in read_items_at(filename, offsets, _FRAME_PATHS):
+        yield _items_to_frame(items)
+
+
+def read_snapshot_at(
+    filename: Union[str, Path],
+    offset: int,
+) -> np.ndarray:
+    """Read the frame starting at byte `offset` (see `scan_snapshots`).
+
+    Returns [N, 7] array: m, x, y, z, vx, vy, vz.
+    """
+    (frame,) = read_snapshots_at(filename, [offset])
+    return frame
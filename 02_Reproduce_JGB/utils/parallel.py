@@ -0,0 +1,83 @@
+"""Parallel execution of independent per-timestamp tasks."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+
+class TaskResult(NamedTuple):
+    """Result of a single task: either `value` or `error` is set."""
+
+    item: Any
+    value: Any = None
+    error: Optional[Exception] = None
+
+
+def _run_task(
+    func: Callable,
+    item: Any,
+    retry_kwargs: Optional[dict] = None,
+    retry_on: Union[type, tuple] = RuntimeError,
+) -> TaskResult:
+    try:
+        return TaskResult(item, value=func(item))
+    except Exception as e:
+        error = e
+
+    if retry_kwargs is not None and isinstance(error, retry_on):
+        try:
+            return TaskResult(item, value=func(item, **retry_kwargs))
+        except Exception as e:
+            error = e
+
+    return TaskResult(item, error=error)
+
+
+def parallel_map(
+    func: Callable,
+    items: Iterable,
+    jobs: int = 1,
+    retry_kwargs: Optional[dict] = None,
+    retry_on: Union[type, tuple] = RuntimeError,
+) -> list[TaskResult]:
+    """Apply `func` to every item in a process pool, keeping the order of
+    items.
+
+    Exceptions do not stop the other tasks: they are captured into
+    `TaskResult.error`, so the caller decides whether to skip or raise.
+
+    Parameters
+    ----------
+    func : Callable
+        Function of a single item. Should be picklable, i.e. defined at module level
+        (use functools.partial to bind other arguments).
+    items : Iterable
+        Items to process, e.g. timestamps.
+    jobs :
+        The number of worker processes. 1 runs tasks in the current process,
+        0 or negative uses all cores. Default: 1.
+    retry_kwargs :
+        If a task fails with `retry_on`, it is retried once as func(item, **retry_kwargs),
+        e.g. {"dens_par": 0} to skip density center computation.
+    retry_on :
+        Exception types which are retried, other errors are returned
+        as is. Default: RuntimeError.
+    Returns
+    -------
+    list[TaskResult]
+    """
+    items = list(items)
+    task = partial(_run_task, func, retry_kwargs=retry_kwargs, retry_on=retry_on)
+
+    if jobs == 1 or len(items) <= 1:
+        return [task(item) for item in items]
+
+    max_workers = jobs if jobs > 0 else os.cpu_count()
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(task, items))
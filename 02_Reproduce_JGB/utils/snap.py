@@ -4,14 +4,30 @@ snapshots."""
 import os
 import subprocess
 import warnings
+from functools import cached_property
+from functools import partial
 from pathlib import Path
 from typing import Annotated
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import Literal
 from typing import Optional
 from typing import Union
 
 import numpy as np
 import unsio.input as uns_in
+from scipy.spatial import cKDTree
+
+from .cache import _RESULT_TYPE
+from .cache import ResultCache
+from .nemofile import NemoFormatError
+from .nemofile import SnapStore
+from .nemofile import is_store
+from .nemofile import load_index
+from .nemofile import read_snapshot_at
+from .nemofile import read_snapshots_at
+from .parallel import parallel_map
 
 # use TIMEFUZZ 1e-6 for snapshots with too frequent outputs (https://github.com/teuben/nemo/issues/162)
 _TIMEFUZZ = os.environ.get("TIMEFUZZ")
@@ -66,13 +82,14 @@ def parse_nemo(
     transpose: bool = True,
     remove_artifacts: bool = True,
     nearest: bool = True,
+    backend: Literal["binary", "nemo"] = "binary",
 ) -> np.ndarray:
     """Get a np.ndarray with particles for a given NEMO snapshot and time.
 
     Parameters
     ----------
     filename : Union[str, Path]
-        the name of NEMO snapshot file
+        the name of NEMO snapshot file or snapshot store (see `utils.nemofile.convert_to_store`)
     t : Union[float, str]
         which time point in snapshot to use for profile calculations
     transpose : bool
@@ -81,12 +98,51 @@ def parse_nemo(
         Whether to remove artifacts after the function execution. Default: True.
     nearest :
         Whether to take the nearest t value. Default: True.
+    backend :
+        'binary' reads the frame in-process (falls back to 'nemo' on failure),
+        'nemo' uses 'snaptrim | s2a' with a temporary ASCII file. Default: 'binary'.
+        Stores are always read in-process.
     Returns
     -------
     np.ndarray
         Array with particles with shape [7, N] (if transposed) or [N, 7] (otherwise).
         7 coordinates are: mass, x, y, z, vx, vy, vz.
     """
+    snap, _ = _read_frame(
+        filename=filename,
+        t=t,
+        remove_artifacts=remove_artifacts,
+        nearest=nearest,
+        backend=backend,
+    )
+    return snap.T if transpose else snap
+
+
+def _read_frame(
+    filename: Union[str, Path],
+    t: Union[float, str],
+    remove_artifacts: bool = True,
+    nearest: bool = True,
+    backend: Literal["binary", "nemo"] = "binary",
+) -> tuple[np.ndarray, float]:
+    """Read a frame as in `parse_nemo`, return [N, 7] array and the time of
+    the selected frame (the requested `t` for 'snaptrim | s2a', which
+    does not report it)."""
+    if is_store(filename):
+        store = SnapStore(filename)
+        i = _select_frame(store.times, float(t), nearest=nearest)
+        return store.frame(i), float(store.times[i])
+
+    if backend == "binary":
+        try:
+            return _parse_nemo_binary(filename=filename, t=float(t), nearest=nearest)
+        except Exception as e:
+            if isinstance(e, RuntimeError) and not isinstance(e, NemoFormatError):
+                raise  # no frame matching `t`, snaptrim would not find it either
+            warnings.warn(
+                f"Failed to read t={t} from {filename} in-process ({e}), falling back to 'snaptrim | s2a'"
+            )
+
     snapfile = build_snapfile(filename, f"_{t}")
     timefuzz = "nearest" if nearest else _TIMEFUZZ
 
@@ -97,7 +153,132 @@ def parse_nemo(
         )
         print(command)
         subprocess.check_call(command, shell=True)
-        return np.loadtxt(snapfile).T if transpose else np.loadtxt(snapfile)
+        return np.loadtxt(snapfile), float(t)
+
+
+def iter_frames(
+    filename: Union[str, Path],
+    times: Iterable[float],
+    transpose: bool = True,
+    nearest: bool = True,
+    remove_artifacts: bool = True,
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Yield (t, particles) for every requested time reading the snapshot
+    in one pass.
+
+    Frames are selected the same way as in `parse_nemo` (nearest frame
+    or the first frame within TIMEFUZZ) using the sidecar frame index,
+    then read in a single forward pass if `times` are sorted.
+
+    Parameters
+    ----------
+    filename : Union[str, Path]
+        the name of NEMO snapshot file or snapshot store
+    times : Iterable[float]
+        time points to extract, e.g. the output of `get_timestamps`
+    transpose : bool
+        Whether to yield transposed particles. Default: True.
+    nearest :
+        Whether to take the nearest t value. Default: True.
+    remove_artifacts :
+        Whether to remove artifacts of the 'snaptrim | s2a' fallback of `parse_nemo`. Default: True.
+    Yields
+    -------
+    tuple[float, np.ndarray]
+        Requested time and array with particles with shape [7, N] (if transposed) or [N, 7] (otherwise).
+    """
+    times = [float(t) for t in times]
+
+    if is_store(filename):
+        store = SnapStore(filename)
+        for t in times:
+            snap = store.frame(_select_frame(store.times, t, nearest=nearest))
+            yield t, snap.T if transpose else snap
+        return
+
+    try:
+        index = load_index(filename)
+    except NemoFormatError as e:
+        warnings.warn(f"Cannot index {filename} ({e}), reading frames one by one")
+        for t in times:
+            yield t, parse_nemo(
+                filename,
+                t,
+                transpose=transpose,
+                remove_artifacts=remove_artifacts,
+                nearest=nearest,
+            )
+        return
+
+    offsets = [
+        index.offsets[_select_frame(index.times, t, nearest=nearest)] for t in times
+    ]
+    for t, snap in zip(times, read_snapshots_at(filename, offsets)):
+        yield t, snap.T if transpose else snap
+
+
+def _uns_frame(fp_uns: uns_in.CUNS_IN) -> np.ndarray:
+    """Copy the current unsio frame into [N, 7] array: m, x, y, z, vx, vy, vz."""
+    _, mass = fp_uns.getData("all", "mass")
+    _, pos = fp_uns.getData("all", "pos")
+    _, vel = fp_uns.getData("all", "vel")
+    return np.column_stack([mass, pos.reshape(-1, 3), vel.reshape(-1, 3)])
+
+
+def _select_frame(times: np.ndarray, t: float, nearest: bool = True) -> int:
+    """Return index of the frame matching `t` the same way as 'snaptrim'
+    does: either the nearest frame or the first frame within TIMEFUZZ."""
+    dt = np.abs(times - t)
+    if not nearest:
+        (candidates,) = np.nonzero(dt <= _TIMEFUZZ)
+        if candidates.size == 0:
+            raise RuntimeError(f"no frame with t={t} (timefuzz={_TIMEFUZZ})")
+        return int(candidates[0])
+    if dt.size == 0:
+        raise RuntimeError("snapshot has no frames")
+    return int(np.argmin(dt))
+
+
+def _parse_nemo_binary(
+    filename: Union[str, Path],
+    t: float,
+    nearest: bool = True,
+) -> tuple[np.ndarray, float]:
+    """Read a single frame straight from the binary NEMO file.
+
+    The frame is located with the sidecar frame index and read by
+    seeking to its offset. Files which cannot be decoded this way are
+    read frame by frame with unsio. Time selection follows 'snaptrim':
+    either the nearest frame or the first frame within TIMEFUZZ from
+    `t`. Returns [N, 7] array and the time of the frame.
+    """
+    try:
+        index = load_index(filename)
+    except NemoFormatError as e:
+        warnings.warn(f"Cannot index {filename} ({e}), reading it with unsio")
+    else:
+        i = _select_frame(index.times, t, nearest=nearest)
+        return read_snapshot_at(filename, index.offsets[i]), float(index.times[i])
+
+    fp_uns = uns_in.CUNS_IN(str(filename), float32=False)
+    snap, snap_time, best_dt = None, None, np.inf
+
+    try:
+        while fp_uns.nextFrame("mxv"):
+            _, time = fp_uns.getData("time")
+            dt = abs(time - t)
+            if nearest:
+                if dt < best_dt:  # copy only frames that improve the match
+                    snap, snap_time, best_dt = _uns_frame(fp_uns), float(time), dt
+            elif dt <= _TIMEFUZZ:
+                snap, snap_time = _uns_frame(fp_uns), float(time)
+                break
+    finally:
+        fp_uns.close()
+
+    if snap is None:
+        raise RuntimeError(f"no frame with t={t} (timefuzz={_TIMEFUZZ})")
+    return snap, snap_time
 
 
 def manipulate_snapshot(
@@ -125,12 +306,123 @@ def manipulate_snapshot(
         return np.loadtxt(last_mp).T
 
 
+_PROFILE_MIN_BODIES = 100  # minimum bodies in radial bin
+_PROFILE_MIN_DLOGR = 0.05  # minimum bin size in log(r)
+
+
+def _adaptive_profile(
+    r: np.ndarray,
+    masses: np.ndarray,
+    projected: bool,
+    min_bodies: int = _PROFILE_MIN_BODIES,
+    min_dlogr: float = _PROFILE_MIN_DLOGR,
+) -> np.ndarray:
+    """Density profile with adaptive radial bins.
+
+    Each bin holds at least `min_bodies` particles and spans at least
+    `min_dlogr` dex, as 'sphereprof'/'projprof' manipulators do. The
+    remainder that doesn't fill a bin is dropped. Radius of a bin is the
+    geometric mean of its particles' radii.
+    """
+    order = np.argsort(r)
+    r = r[order]
+    m_cum = np.concatenate([[0.0], np.cumsum(masses[order])])
+    logr_cum = np.concatenate(
+        [[0.0], np.cumsum(np.log10(np.maximum(r, np.finfo(r.dtype).tiny)))]
+    )
+
+    # bin k holds sorted particles [idx[k], idx[k + 1]) within radii (edges[k], edges[k + 1]]
+    idx, edges = [0], [0.0]
+    while True:
+        i = idx[-1]
+        j = max(i + min_bodies, np.searchsorted(r, edges[-1] * 10**min_dlogr) + 1)
+        if j > r.size:
+            break
+        idx.append(j)
+        edges.append(r[j - 1])
+
+    idx, edges = np.array(idx), np.array(edges)
+    mass = m_cum[idx[1:]] - m_cum[idx[:-1]]
+    radius = 10 ** ((logr_cum[idx[1:]] - logr_cum[idx[:-1]]) / np.diff(idx))
+    if projected:
+        density = mass / (np.pi * np.diff(edges**2))
+    else:
+        density = mass / (4 / 3 * np.pi * np.diff(edges**3))
+    return np.vstack([radius, density])
+
+
+def spherical_profile(
+    snap: np.ndarray,
+    center: Optional[np.ndarray] = None,
+    min_bodies: int = _PROFILE_MIN_BODIES,
+    min_dlogr: float = _PROFILE_MIN_DLOGR,
+) -> np.ndarray:
+    """Spherical density profile for loaded particles (NumPy analogue of
+    NEMO's 'sphereprof').
+
+    Parameters
+    ----------
+    snap : np.ndarray
+        Array with particles with shape [7, N]: mass, x, y, z, vx, vy, vz (see `parse_nemo`).
+    center :
+        Coordinates x, y, z of the center. If None, the origin is used.
+    min_bodies :
+        Minimum number of bodies in radial bin. Default: 100.
+    min_dlogr :
+        Minimum bin size in log(r). Default: 0.05.
+    Returns
+    -------
+    np.ndarray, the first row of which is distance and the second row is density
+    """
+    center = np.zeros(3) if center is None else center
+    return SnapFrame(snap, dens_par=0, center=center).spherical_profile(
+        min_bodies=min_bodies, min_dlogr=min_dlogr
+    )
+
+
+def projected_profiles(
+    snap: np.ndarray,
+    projvectors: Iterable[_PROJ_VECTOR_TYPE],
+    center: Optional[np.ndarray] = None,
+    min_bodies: int = _PROFILE_MIN_BODIES,
+    min_dlogr: float = _PROFILE_MIN_DLOGR,
+) -> list[np.ndarray]:
+    """Projected density profiles for several lines of sight at once (NumPy
+    analogue of NEMO's 'projprof').
+
+    Projected distances for all lines of sight are computed with a single
+    matrix product.
+
+    Parameters
+    ----------
+    snap : np.ndarray
+        Array with particles with shape [7, N]: mass, x, y, z, vx, vy, vz (see `parse_nemo`).
+    projvectors :
+        Line-of-sight vectors, each of size 3 (need not be normalized).
+    center :
+        Coordinates x, y, z of the center. If None, the origin is used.
+    min_bodies :
+        Minimum number of bodies in radial bin. Default: 100.
+    min_dlogr :
+        Minimum bin size in log(r). Default: 0.05.
+    Returns
+    -------
+    list[np.ndarray]
+        Profile for every line of sight: the first row is projected distance and the second row is surface density.
+    """
+    center = np.zeros(3) if center is None else center
+    return SnapFrame(snap, dens_par=0, center=center).projected_profiles(
+        projvectors, min_bodies=min_bodies, min_dlogr=min_dlogr
+    )
+
+
 def profile_by_snap(
     filename: Union[str, Path],
     t: Union[float, str],
     projvector: Optional[_PROJ_VECTOR_TYPE] = None,
     remove_artifacts: bool = True,
     dens_par: int = 500,
+    backend: Literal["numpy", "nemo"] = "numpy",
 ) -> np.ndarray:
     """Get a np.ndarray with density profile for a given snapshot and time.
 
@@ -146,17 +438,28 @@ def profile_by_snap(
         Otherwise computes the projected density using `projvector` as a line-of-sight vector (see NEMO's 'projprof').
     remove_artifacts :
         Whether to remove artifacts after the function execution. Default: True.
+    dens_par :
+        Parameter for `dens_centre` (number of neighbours in SPH-like estimation).
+        If 0, density center is not computed. Default: 500.
+    backend :
+        'numpy' computes the profile in-process (see `spherical_profile` and `projected_profiles`),
+        'nemo' uses 'manipulate sphereprof/projprof'. Default: 'numpy'.
     Returns
     -------
     np.ndarray, the first row of which is distance and the second row is density
     """
-    if projvector and len(projvector) != 3:
+    if projvector is not None and len(projvector) != 3:
         raise RuntimeError(f"`projvector` should have len == 3, got {projvector}")
 
+    if backend == "numpy":
+        frame = load_frame(filename=filename, t=t, dens_par=dens_par)
+        if projvector is None:
+            return frame.spherical_profile()
+        (prof,) = frame.projected_profiles([projvector])
+        return prof
+
     manipname = "sphereprof" if not projvector else "projprof"
-    manippars_binning = (
-        "100,0.05"  # minimum bodies in radial bin, minimum bin size in log(r)
-    )
+    manippars_binning = f"{_PROFILE_MIN_BODIES},{_PROFILE_MIN_DLOGR}"
     if projvector:
         manippars = ",".join([str(_) for _ in projvector]) + "," + manippars_binning
     else:
@@ -183,12 +486,83 @@ def profile_by_snap(
     return result
 
 
+def compute_lagrange_radii(
+    snap: np.ndarray,
+    fractions: Iterable[float],
+    center: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Compute Lagrange radii for several mass fractions at once.
+
+    All radii are obtained from a single argsort of particle distances and a
+    cumulative mass sum, which makes it cheap to evaluate many fractions
+    (e.g. all `_FULL_COLS` from `utils.nbody6_log`) per frame.
+
+    Parameters
+    ----------
+    snap : np.ndarray
+        Array with particles with shape [7, N]: mass, x, y, z, vx, vy, vz (see `parse_nemo`).
+    fractions : Iterable[float]
+        Fractions of total mass, each should be in [0, 1].
+    center :
+        Coordinates x, y, z of the center. If None, the origin is used (as NEMO's 'lagrange' does).
+    Returns
+    -------
+    np.ndarray
+        Lagrange radii with the same length as `fractions`.
+    """
+    center = np.zeros(3) if center is None else center
+    return SnapFrame(snap, dens_par=0, center=center).lagrange_radii(fractions)
+
+
+def lagrange_radii_by_snap(
+    filename: Union[str, Path],
+    t: Union[float, str],
+    fractions: Iterable[float],
+    remove_artifacts: bool = True,
+    dens_par: int = 500,
+    center_backend: Literal["numpy", "nemo"] = "numpy",
+) -> np.ndarray:
+    """Compute Lagrange radii for several mass fractions reading the frame
+    once (see `compute_lagrange_radii`).
+
+    Parameters
+    ----------
+    filename : Union[str, Path]
+        the name of NEMO snapshot file
+    t : Union[float, str]
+        which time point in snapshot to use for profile calculations
+    fractions : Iterable[float]
+        fractions of mass
+    remove_artifacts :
+        Whether to remove artifacts after the function execution. Default: True.
+    dens_par :
+        Parameter for `dens_centre` (number of neighbours in SPH-like estimation).
+        If 0, radii are computed from the origin. Default: 500.
+    center_backend :
+        Backend for density center: 'numpy' or 'nemo' (see `center_of_snap`). Default: 'numpy'.
+    Returns
+    -------
+    np.ndarray
+        Lagrange radii with the same length as `fractions`.
+    """
+    frame = load_frame(
+        filename=filename,
+        t=t,
+        remove_artifacts=remove_artifacts,
+        dens_par=dens_par,
+        center_backend=center_backend,
+    )
+    return frame.lagrange_radii(fractions)
+
+
 def lagrange_radius_by_snap(
     filename: Union[str, Path],
     t: Union[float, str],
     fraction: float = 0.5,
     remove_artifacts: bool = True,
     dens_par: int = 500,
+    backend: Literal["numpy", "nemo"] = "numpy",
+    center_backend: Literal["numpy", "nemo"] = "numpy",
 ) -> np.ndarray:
     """
     Compute a lagrange radius for a given snapshot and time.
@@ -207,11 +581,26 @@ def lagrange_radius_by_snap(
         Whether to remove artifacts after the function execution. Default: True.
     dens_par :
         Parameter for `dens_centre` (number of neighbours in SPH-like estimation). Default: 500.
+    backend :
+        'numpy' computes the radius in-process (see `compute_lagrange_radii`),
+        'nemo' uses 'manipulate lagrange'. Default: 'numpy'.
+    center_backend :
+        Backend for density center with `backend='numpy'` (see `center_of_snap`). Default: 'numpy'.
     Returns
     -------
     np.ndarray
-        Array with two elements: time and lagrange radius.
+        Array with two elements: time of the selected frame and lagrange radius.
     """
+    if backend == "numpy":
+        frame = load_frame(
+            filename=filename,
+            t=t,
+            remove_artifacts=remove_artifacts,
+            dens_par=dens_par,
+            center_backend=center_backend,
+        )
+        return np.array([frame.t, frame.lagrange_radius(fraction)], dtype=np.float64)
+
     if dens_par:
         manipname = "dens_centre+lagrange"
         manippars = f"{dens_par};{fraction}"
@@ -240,6 +629,7 @@ def center_of_snap(
     density_center: bool = False,
     remove_artifacts: bool = True,
     dens_par: int = 500,
+    backend: Literal["numpy", "nemo"] = "numpy",
 ) -> np.ndarray:
     """Compute a center-of-mass or density center for a given snapshot.
 
@@ -255,11 +645,20 @@ def center_of_snap(
         Whether to remove artifacts after the function execution. Default: True.
     dens_par :
         Parameter for `dens_centre` (number of neighbours in SPH-like estimation). Default: 500.
+    backend :
+        'numpy' computes the center in-process (see `center_of_particles`),
+        'nemo' uses 'manipulate dens_centre' or 'manipulate centre_of_mass'. Default: 'numpy'.
     Returns
     -------
     np.ndarray
-        Array with the following structure: t, x, y, z, vx, vy, vz.
+        Array with the following structure: t (of the selected frame), x, y, z, vx, vy, vz.
+        Empty array if NEMO's 'dens_centre' didn't converge.
     """
+    if backend == "numpy":
+        frame = load_frame(filename=filename, t=t, dens_par=dens_par)
+        center = frame.density_center if density_center else frame.center_of_mass
+        return np.array([frame.t, *center], dtype=np.float64)
+
     if density_center:
         manipname = "dens_centre"
         manippars = str(dens_par)
@@ -281,12 +680,258 @@ def center_of_snap(
     return result
 
 
+def center_of_particles(
+    snap: np.ndarray,
+    density_center: bool = False,
+    dens_par: int = 500,
+) -> np.ndarray:
+    """Compute a center-of-mass or density center for loaded particles.
+
+    Parameters
+    ----------
+    snap : np.ndarray
+        Array with particles with shape [7, N]: mass, x, y, z, vx, vy, vz (see `parse_nemo`).
+    density_center : bool
+        whether to compute density center instead of center-of-mass. Default: False
+    dens_par :
+        The number of neighbours used for density estimation (see `find_density_center`). Default: 500.
+    Returns
+    -------
+    np.ndarray
+        Array with the following structure: x, y, z, vx, vy, vz.
+    """
+    frame = SnapFrame(snap, dens_par=dens_par)
+    return frame.density_center if density_center else frame.center_of_mass
+
+
+class SnapFrame:
+    """Particles of a single snapshot frame with memoized derived
+    quantities.
+
+    Particles are stored once; center of mass, density center, radii from
+    the center, their sorted order, Lagrange radii and masks are computed
+    on first access and reused afterwards.
+    """
+
+    def __init__(
+        self,
+        snap: Union[np.ndarray, tuple[np.ndarray, np.ndarray, np.ndarray]],
+        t: Optional[float] = None,
+        dens_par: int = 500,
+        center: Optional[np.ndarray] = None,
+    ):
+        """
+        Parameters
+        ----------
+        snap :
+            Array with particles with shape [7, N]: mass, x, y, z, vx, vy, vz (see `parse_nemo`),
+            or a tuple of masses [N], positions [N, 3] and velocities [N, 3]
+            (e.g. zero-copy views from `SnapStore.get`, see `load_frame`).
+        t :
+            Time of the frame.
+        dens_par :
+            The number of neighbours used for density center estimation (see `find_density_center`).
+            If 0, the origin is used as a center. Default: 500.
+        center :
+            Coordinates x, y, z of the center used for radii. Overrides `dens_par` if given.
+        """
+        if isinstance(snap, tuple):
+            self.masses, self.positions, self.velocities = snap
+        else:
+            self.masses, self.positions, self.velocities = (
+                snap[0],
+                snap[1:4].T,
+                snap[4:7].T,
+            )
+        self.t = t
+        self.dens_par = dens_par
+        if center is not None:
+            self.center = np.asarray(center, dtype=np.float64)
+        self._lagrange_radii = {}
+        self._lagrange_masks = {}
+
+    @property
+    def N(self) -> int:
+        return self.masses.size
+
+    @cached_property
+    def center_of_mass(self) -> np.ndarray:
+        """Center of mass: x, y, z, vx, vy, vz."""
+        m = self.masses
+        return np.concatenate([m @ self.positions, m @ self.velocities]) / m.sum()
+
+    @cached_property
+    def density_center(self) -> np.ndarray:
+        """Density center: x, y, z, vx, vy, vz."""
+        return find_density_center(
+            self.positions, self.masses, k=self.dens_par, velocities=self.velocities
+        )
+
+    @cached_property
+    def center(self) -> np.ndarray:
+        """Center used for radii: density center if `dens_par` else the origin.
+
+        Velocities are not read unless the full density center is already known.
+        """
+        if not self.dens_par:
+            return np.zeros(3)
+        if "density_center" in self.__dict__:
+            return self.density_center[:3]
+        return find_density_center(self.positions, self.masses, k=self.dens_par)
+
+    @cached_property
+    def radii(self) -> np.ndarray:
+        return np.linalg.norm(self.positions - self.center, axis=1)
+
+    @cached_property
+    def order(self) -> np.ndarray:
+        """Particle indices sorted by distance from the center."""
+        return np.argsort(self.radii)
+
+    @cached_property
+    def _mass_cumsum(self) -> np.ndarray:
+        return np.cumsum(self.masses[self.order])
+
+    def lagrange_radii(self, fractions: Iterable[float]) -> np.ndarray:
+        """Lagrange radii for given fractions of total mass (each in [0, 1])."""
+        fractions = np.asarray(fractions, dtype=np.float64)
+        if np.any((fractions < 0) | (fractions > 1)):
+            raise RuntimeError(f"fractions should be in [0, 1], got {fractions}")
+
+        missing = [f for f in fractions if f not in self._lagrange_radii]
+        if missing:
+            m_cum = self._mass_cumsum
+            # index of the first particle at which enclosed mass reaches the fraction
+            idx = np.searchsorted(m_cum, np.array(missing) * m_cum[-1], side="left")
+            radii = self.radii[self.order[np.minimum(idx, self.N - 1)]]
+            self._lagrange_radii.update(zip(missing, radii))
+
+        return np.array([self._lagrange_radii[f] for f in fractions])
+
+    def lagrange_radius(self, fraction: float = 0.5) -> float:
+        (radius,) = self.lagrange_radii([fraction])
+        return radius
+
+    def lagrange_mask(self, fraction: float = 0.5) -> np.ndarray[bool]:
+        """Mask of particles inside the Lagrange radius for `fraction`."""
+        if fraction not in self._lagrange_masks:
+            self._lagrange_masks[fraction] = self.radii < self.lagrange_radius(fraction)
+        return self._lagrange_masks[fraction]
+
+    def spherical_profile(
+        self,
+        min_bodies: int = _PROFILE_MIN_BODIES,
+        min_dlogr: float = _PROFILE_MIN_DLOGR,
+    ) -> np.ndarray:
+        """Spherical density profile around the center (see `spherical_profile`)."""
+        return _adaptive_profile(
+            self.radii,
+            self.masses,
+            projected=False,
+            min_bodies=min_bodies,
+            min_dlogr=min_dlogr,
+        )
+
+    def projected_profiles(
+        self,
+        projvectors: Iterable[_PROJ_VECTOR_TYPE],
+        min_bodies: int = _PROFILE_MIN_BODIES,
+        min_dlogr: float = _PROFILE_MIN_DLOGR,
+    ) -> list[np.ndarray]:
+        """Projected density profiles around the center for several lines
+        of sight (see `projected_profiles`)."""
+        n = np.atleast_2d(np.asarray(projvectors, dtype=np.float64))
+        if n.shape[1] != 3:
+            raise RuntimeError(
+                f"projection vectors should have len == 3, got {projvectors}"
+            )
+        n = n / np.linalg.norm(n, axis=1, keepdims=True)
+
+        pos = self.positions - self.center
+        los = pos @ n.T  # [N, K] coordinates along lines of sight
+        R = np.sqrt(np.maximum(np.sum(pos**2, axis=1)[:, None] - los**2, 0))
+
+        return [
+            _adaptive_profile(
+                R[:, i],
+                self.masses,
+                projected=True,
+                min_bodies=min_bodies,
+                min_dlogr=min_dlogr,
+            )
+            for i in range(n.shape[0])
+        ]
+
+
+def _store_frame(
+    store: SnapStore, t: float, nearest: bool = True, dens_par: int = 500
+) -> SnapFrame:
+    """Frame of a snapshot store matching `t` (see `_select_frame`), backed
+    by memory-mapped views: only the fields actually used are read."""
+    i = _select_frame(store.times, t, nearest=nearest)
+    particles = tuple(store.get(field, i) for field in ("mass", "pos", "vel"))
+    return SnapFrame(particles, t=float(store.times[i]), dens_par=dens_par)
+
+
+def load_frame(
+    filename: Union[str, Path],
+    t: Union[float, str],
+    remove_artifacts: bool = True,
+    dens_par: int = 500,
+    center_backend: Literal["numpy", "nemo"] = "numpy",
+) -> SnapFrame:
+    """Read a frame once and wrap it into `SnapFrame`.
+
+    Parameters
+    ----------
+    filename : Union[str, Path]
+        the name of NEMO snapshot file
+    t : Union[float, str]
+        which time point in snapshot to use
+    remove_artifacts :
+        Whether to remove artifacts after the function execution. Default: True.
+    dens_par :
+        Parameter for `dens_centre` (number of neighbours in SPH-like estimation).
+        If 0, density center is not computed. Default: 500.
+    center_backend :
+        Backend for density center: 'numpy' or 'nemo' (see `center_of_snap`). Default: 'numpy'.
+    Returns
+    -------
+    SnapFrame
+        Frame with `t` set to the time of the selected frame (see `parse_nemo`).
+        For snapshot stores particles are zero-copy views of the memory-mapped fields.
+    """
+    if is_store(filename):
+        frame = _store_frame(SnapStore(filename), t=float(t), dens_par=dens_par)
+    else:
+        snap, frame_time = _read_frame(
+            filename=filename, t=t, remove_artifacts=remove_artifacts
+        )
+        frame = SnapFrame(snap.T, t=frame_time, dens_par=dens_par)
+
+    if dens_par and center_backend == "nemo":
+        center = center_of_snap(
+            filename=filename,
+            t=t,
+            density_center=True,
+            remove_artifacts=remove_artifacts,
+            dens_par=dens_par,
+            backend=center_backend,
+        )  # center_coords : snap_t, x, y, z, vx, vy, vz
+        if center.size == 0:
+            raise RuntimeError(f"'dens_centre' didn't converge for t={t}")
+        frame.density_center = center[1:7]
+
+    return frame
+
+
 def masses_in_lagrange_radius(
     filename: Union[str, Path],
     t: Union[float, str],
     remove_artifacts: bool = True,
     dens_par: int = 500,
     fraction: float = 0.5,
+    center_backend: Literal["numpy", "nemo"] = "numpy",
 ) -> tuple[np.ndarray[np.float32], float, np.ndarray[bool]]:
     """Compute which masses of cluster reside inside the lagrange radius.
 
@@ -302,6 +947,8 @@ def masses_in_lagrange_radius(
         Parameter for `dens_centre` (number of neighbours in SPH-like estimation). Default: 500.
     fraction :
         Fraction of mass used to compute the Lagrange radius. Default: 0.5
+    center_backend :
+        Backend for density center: 'numpy' or 'nemo' (see `center_of_snap`). Default: 'numpy'.
     Returns
     -------
     tuple[np.ndarray[np.float32], float, np.ndarray[bool]]
@@ -309,51 +956,61 @@ def masses_in_lagrange_radius(
         Second element: lagrange radius 50% for the snapshot
         Third element: binary mask for masses
     """
-    snap = parse_nemo(filename=filename, t=t)  # m, x, y, z, vx, vy, vz
-    masses = snap[0]
-
-    if dens_par:
-        # calculate density center
-        center = center_of_snap(
-            filename=filename,
-            t=t,
-            density_center=True,
-            remove_artifacts=remove_artifacts,
-            dens_par=dens_par,
-        )  # center_coords : snap_t, x, y, z, vx, vy, vz
-        if center.size == 0:
-            raise RuntimeError(f"'dens_centre' didn't converge for t={t}")
-    else:
-        center = np.array([0, 0, 0, 0], dtype=np.float32)
-
-    # calculate lagrange radius
-    snap_t, lagrange_r = lagrange_radius_by_snap(
-        filename,
-        t,
+    frame = load_frame(
+        filename=filename,
+        t=t,
         remove_artifacts=remove_artifacts,
         dens_par=dens_par,
-        fraction=fraction,
+        center_backend=center_backend,
     )
 
-    # create mask
-    dist = np.linalg.norm(snap[1:4].T - center[1:4], axis=1)
-    mask = dist < lagrange_r
+    lagrange_r = frame.lagrange_radius(fraction)
+    mask = frame.lagrange_mask(fraction)
     print(f"Number of particles for fraction={fraction}: {mask.sum()}")
 
-    return masses, lagrange_r, mask
+    return frame.masses, lagrange_r, mask
 
 
 def generate_timestamps(filename: Union[str, Path]):
     """This generator yields timestamps for a given file.
 
-    Could be very slow!
+    Timestamps are taken from the sidecar frame index (see
+    `utils.nemofile.load_index`), which is built on the first call.
+    Falls back to decoding every frame with unsio for files that cannot
+    be indexed (could be very slow!). Snapshot stores keep timestamps
+    in 'times.npy'.
     """
+    if is_store(filename):
+        yield from SnapStore(filename).times
+        return
+
+    try:
+        yield from load_index(filename).times
+        return
+    except NemoFormatError as e:
+        warnings.warn(f"Cannot index {filename} ({e}), reading timestamps with unsio")
+
     fp_uns = uns_in.CUNS_IN(str(filename), float32=True)
 
     while fp_uns.nextFrame("mxv"):
         yield fp_uns.getData("time")[1]
 
 
+def build_index(filename: Union[str, Path]):
+    """Build the sidecar frame index of a NEMO snapshot unless it is up to
+    date (see `utils.nemofile.load_index`).
+
+    Call it before starting worker processes, so that workers load the
+    index instead of scanning the same file at once.
+    """
+    if is_store(filename):
+        return
+    try:
+        load_index(filename)
+    except NemoFormatError:
+        pass  # not indexable, frames are read with unsio
+
+
 def get_timestamps(
     filename: Union[str, Path],
     n_timestamps: int = 100,
@@ -376,23 +1033,197 @@ def get_timestamps(
     return np.array(timestamps)[indices]
 
 
+def _iter_snap_frames(
+    filename: Union[str, Path], times: Iterable[float], remove_artifacts: bool = True
+) -> Iterator[SnapFrame]:
+    """Frames for `times` as `SnapFrame` centered at the origin (see `iter_frames`)."""
+    if is_store(filename):
+        store = SnapStore(filename)
+        for t in times:
+            yield _store_frame(store, t=float(t), dens_par=0)
+        return
+
+    frames = iter_frames(
+        filename=filename, times=times, remove_artifacts=remove_artifacts
+    )
+    for t, snap in frames:
+        yield SnapFrame(snap, t=t, dens_par=0)
+
+
+def _compute_frame(
+    filename: Union[str, Path],
+    compute: Callable[[float, SnapFrame], _RESULT_TYPE],
+    t: float,
+    remove_artifacts: bool = True,
+) -> _RESULT_TYPE:
+    frame = load_frame(
+        filename=filename, t=t, remove_artifacts=remove_artifacts, dens_par=0
+    )
+    return compute(t, frame)
+
+
+def cached_frame_results(
+    cache: ResultCache,
+    filename: Union[str, Path],
+    times: Iterable[float],
+    compute: Callable[[float, SnapFrame], _RESULT_TYPE],
+    jobs: int = 1,
+    remove_artifacts: bool = True,
+    **params,
+) -> list[_RESULT_TYPE]:
+    """Return compute(t, frame) for all times, reading only frames that are
+    not cached yet.
+
+    `frame` is a `SnapFrame` centered at the origin (`dens_par=0`), for
+    snapshot stores it holds zero-copy views of the fields.
+
+    With `jobs=1` missing frames are read in one pass with `iter_frames`,
+    otherwise every worker process reads and processes its own frames
+    (see `utils.parallel.parallel_map`, `compute` should be picklable).
+    `params` should contain everything `compute` depends on besides the
+    frame, results are keyed by them and by the name of `compute`.
+    `remove_artifacts` is passed to the 'snaptrim | s2a' fallback of
+    `parse_nemo`.
+    """
+    func = compute
+    while isinstance(func, partial):
+        func = func.func
+    func_name = f"{func.__module__}.{func.__qualname__}"
+
+    times = list(times)
+    keys = [cache.key(filename, t, compute=func_name, **params) for t in times]
+    results = [cache.get(key) for key in keys]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    missing_times = [times[i] for i in missing]
+
+    if jobs == 1:
+        frames = _iter_snap_frames(
+            filename=filename,
+            times=missing_times,
+            remove_artifacts=remove_artifacts,
+        )
+        computed = (compute(t, frame) for t, frame in zip(missing_times, frames))
+    else:
+        if missing_times:
+            build_index(filename)  # once, before workers read frames
+        tasks = parallel_map(
+            partial(
+                _compute_frame, filename, compute, remove_artifacts=remove_artifacts
+            ),
+            missing_times,
+            jobs=jobs,
+        )
+        for task in tasks:
+            if task.error is not None:
+                raise task.error
+        computed = (task.value for task in tasks)
+
+    for i, result in zip(missing, computed):
+        results[i] = result
+        cache.put(keys[i], result)
+
+    return results
+
+
+def _local_density(
+    positions: np.ndarray[float],
+    masses: np.ndarray[float],
+    k: int,
+    workers: int = -1,
+    chunk_size: int = 2**22,
+) -> np.ndarray[float]:
+    """Density estimate by `k` nearest neighbours for every particle.
+
+    KD-tree queries are multi-threaded and done in chunks, so memory
+    stays bounded for large `k`. Particles whose `k` neighbours coincide
+    with them (zero distance) get the highest finite density.
+    """
+    tree = cKDTree(positions)
+    rho = np.empty(positions.shape[0], dtype=np.float64)
+    step = max(1, chunk_size // (k + 1))
+
+    for start in range(0, positions.shape[0], step):
+        # distances to k+1 neighbours including self at zero
+        dists, idxs = tree.query(
+            positions[start : start + step], k=k + 1, workers=workers
+        )
+        rk = dists[:, k]  # k-th neighbor distance (exclude self at index 0)
+        mass_k = masses[idxs[:, 1 : k + 1]].sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rho[start : start + step] = mass_k / (4 / 3 * np.pi * rk**3)
+
+    infinite = ~np.isfinite(rho)
+    if infinite.any():  # duplicate positions, rk == 0
+        rho[infinite] = rho[~infinite].max() if not infinite.all() else 1.0
+    return rho
+
+
 def find_density_center(
     positions: np.ndarray[float],
     masses: np.ndarray[float],
     k: int = 6,
-):
+    velocities: Optional[np.ndarray[float]] = None,
+    refine: bool = False,
+    max_n: Optional[int] = 200_000,
+    workers: int = -1,
+    seed: int = 0,
+) -> np.ndarray[float]:
     """Estimates density center by positions[N, 3] and masses[N,] using
-    Casertano-Hut algo (note that NEMO uses another one)."""
-    tree = cKDTree(positions)
-    dists, idxs = tree.query(
-        positions, k=k + 1
-    )  # distances to k+1 neighbours including self at zero
-    rk = dists[:, k]  # k-th neighbor distance (exclude self at index 0)
-
-    # compute rho by k nearest particles
-    neigh_idx = idxs[:, 1 : k + 1]
-    mass_k = masses[neigh_idx].sum(axis=1)
-    rho = mass_k / (4 / 3 * np.pi * rk**3)
-
-    i_max = np.nanargmax(rho)
-    return positions[i_max]
+    Casertano-Hut algo (note that NEMO uses another one).
+
+    The center is a density-weighted mean of particle positions (and
+    velocities, if given), where density is estimated by `k` nearest
+    neighbours.
+
+    Parameters
+    ----------
+    positions : np.ndarray[float]
+        Particle positions with shape [N, 3].
+    masses : np.ndarray[float]
+        Particle masses with shape [N,].
+    k : int
+        The number of neighbours used for density estimation. Default: 6.
+    velocities :
+        Particle velocities with shape [N, 3]. If given, density-weighted velocity is also returned.
+    refine :
+        Whether to refine the center with shrinking spheres (each iteration keeps particles within
+        a sphere 0.75 times smaller and recomputes density-weighted mean). Default: False.
+    max_n :
+        If N > max_n, density is estimated on a random subsample of `max_n` particles. Default: 200_000.
+    workers :
+        The number of threads for KD-tree queries (-1 means all cores). Default: -1.
+    seed :
+        Random seed used for subsampling. Default: 0.
+    Returns
+    -------
+    np.ndarray[float]
+        Array x, y, z (or x, y, z, vx, vy, vz if `velocities` are given).
+    """
+    points = positions if velocities is None else np.hstack([positions, velocities])
+
+    if max_n and positions.shape[0] > max_n:
+        subset = np.random.default_rng(seed).choice(
+            positions.shape[0], max_n, replace=False
+        )
+        points, masses = points[subset], masses[subset]
+
+    k = min(k, points.shape[0] - 1)
+    if k < 1:
+        raise RuntimeError("Density center needs at least 2 particles")
+
+    rho = _local_density(points[:, :3], masses, k=k, workers=workers)
+    center = rho @ points / rho.sum()
+
+    if refine:
+        radius = np.median(np.linalg.norm(points[:, :3] - center[:3], axis=1))
+        while True:
+            inside = np.linalg.norm(points[:, :3] - center[:3], axis=1) < radius
+            if inside.sum() <= k:
+                break
+            center = rho[inside] @ points[inside] / rho[inside].sum()
+            radius *= 0.75
+
+    if not np.all(np.isfinite(center)):
+        raise RuntimeError(f"Density center is not finite: {center}")
+    return center